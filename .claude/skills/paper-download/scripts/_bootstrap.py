@@ -0,0 +1,18 @@
+"""
+Make the project root importable for the paper-download helper scripts.
+
+Importing this module (it sits next to the scripts, so it is always on ``sys.path`` when
+they run) inserts the nearest directory containing ``pyproject.toml`` or the
+``auto_paper_download`` package at the front of ``sys.path``.
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+_HERE = Path(__file__).resolve()
+for _candidate in [_HERE.parent, *_HERE.parents]:
+    if (_candidate / "pyproject.toml").exists() or (_candidate / "auto_paper_download").exists():
+        sys.path.insert(0, str(_candidate))
+        break
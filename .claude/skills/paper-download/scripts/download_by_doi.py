@@ -15,24 +15,20 @@ from __future__ import annotations
 
 import argparse
 import logging
-from pathlib import Path
-
 import sys
-from pathlib import Path as _Path
+from pathlib import Path
 
-# Ensure project root is on sys.path so `auto_paper_download` is importable
-_HERE = _Path(__file__).resolve()
-for _candidate in [_HERE.parent, *_HERE.parents]:
-    if (_candidate / "pyproject.toml").exists() or (_candidate / "auto_paper_download").exists():
-        sys.path.insert(0, str(_candidate))
-        break
+import _bootstrap  # noqa: F401  (puts the project root on sys.path)
 
 from auto_paper_download.clients import DownloadError
 from auto_paper_download.downloader import (
     DEFAULT_DELAY_SECONDS,
     download_from_dois,
+    normalize_doi,
 )
 
+LOGGER = logging.getLogger("auto_paper_download.single")
+
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -43,7 +39,7 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--doi",
         required=True,
-        help="DOI to download (e.g., 10.1038/s41586-020-2649-2)",
+        help="DOI to download (e.g., 10.1038/s41586-020-2649-2 or https://doi.org/10.1038/s41586-020-2649-2)",
     )
     parser.add_argument(
         "--output-dir",
@@ -55,7 +51,7 @@ def build_parser() -> argparse.ArgumentParser:
         "--delay",
         type=float,
         default=DEFAULT_DELAY_SECONDS,
-        help="Seconds to wait between downloads (min 1.0, default 1.5)",
+        help="Seconds between downloads from the same publisher (min 1.0, default 1.5)",
     )
     parser.add_argument(
         "--overwrite",
@@ -84,7 +80,7 @@ def main(argv: list[str] | None = None) -> None:
         format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
     )
 
-    doi = args.doi.strip()
+    doi = normalize_doi(args.doi)
     if not doi:
         raise SystemExit("DOI must be non-empty.")
 
@@ -99,20 +95,19 @@ def main(argv: list[str] | None = None) -> None:
             )
         )
     except DownloadError as exc:
-        logging.error("Download aborted: %s", exc)
+        LOGGER.error("Download aborted: %s", exc)
         raise SystemExit(1) from exc
 
     if args.dry_run:
-        logging.info("Dry run finished; no files were downloaded.")
+        LOGGER.info("Dry run finished; no files were downloaded.")
         return
 
     if not downloads:
-        logging.info("No files downloaded.")
+        LOGGER.info("No files downloaded.")
         return
 
-    for path in downloads:
-        print(path)
-    logging.info("Saved %d path(s).", len(downloads))
+    sys.stdout.writelines(f"{path}\n" for path in downloads)
+    LOGGER.info("Saved %d path(s).", len(downloads))
 
 
 if __name__ == "__main__":
@@ -19,38 +19,131 @@ from __future__ import annotations
 
 import argparse
 import logging
+import mmap
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import chain, islice
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
 import json
-from datetime import datetime
 
-import sys
-from pathlib import Path as _Path
+import _bootstrap  # noqa: F401  (puts the project root on sys.path)
 
-# Ensure project root is on sys.path so `auto_paper_download` is importable
-_HERE = _Path(__file__).resolve()
-for _candidate in [_HERE.parent, *_HERE.parents]:
-    if (_candidate / "pyproject.toml").exists() or (_candidate / "auto_paper_download").exists():
-        sys.path.insert(0, str(_candidate))
-        break
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional speed-up; stdlib json is used otherwise
+    orjson = None
 
-from auto_paper_download.clients import DownloadError
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
+except ImportError:  # optional speed-up for very large DOI files
+    pa = pc = None
+
+from auto_paper_download.cache import METADATA_CACHE_FILENAME, MetadataCache
+from auto_paper_download.clients import DEFAULT_PUBLISHER_CONCURRENCY, DownloadError
 from auto_paper_download.downloader import (
     DEFAULT_DELAY_SECONDS,
+    classify_publisher,
     download_from_dois,
+    load_env_file,
+    normalize_doi,
 )
+from auto_paper_download.sessions import build_http_adapter
+
+LOGGER = logging.getLogger("auto_paper_download.multi")
+
+DEFAULT_WORKERS = 4
+REPORT_BUFFER_SIZE = 1 << 16
+DEFAULT_CHECKPOINT_EVERY = 10
+FLUSH_MAX_INTERVAL_SECONDS = 5.0
+PYARROW_MIN_DOIS = 10_000
+# Same prefix as ``downloader.DOI_URL_PREFIX``, spelled for Arrow's RE2 engine.
+DOI_URL_PREFIX_RE2 = r"(?i)^https?://(?:dx\.)?doi\.org/"
+
+
+def _iter_raw_dois(dois: Optional[Iterable[str]], doi_file: Optional[Path]) -> Iterator[str]:
+    """Yield DOIs from the command line, then stream ``doi_file`` one line at a time."""
+    if dois:
+        yield from dois
+    if doi_file:
+        with doi_file.open("rb") as fh:
+            # mmap cannot map an empty file.
+            if os.fstat(fh.fileno()).st_size == 0:
+                return
+            # Lines are sliced straight out of the mapping, so memory stays flat for huge lists.
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for line in iter(mm.readline, b""):
+                    yield line.decode("utf-8", "replace")
+
+
+def _normalize_dois(raw_dois: Iterable[str]) -> list[str]:
+    """
+    Normalize ``raw_dois`` with ``normalize_doi`` and de-duplicate them, keeping the first occurrence.
+
+    Inputs longer than ``PYARROW_MIN_DOIS`` are normalized in one vectorized pass when pyarrow
+    is installed; shorter inputs (or runs without pyarrow) keep streaming through Python.
+    """
+    if pa is not None:
+        raw_iter = iter(raw_dois)
+        head = list(islice(raw_iter, PYARROW_MIN_DOIS + 1))
+        if len(head) > PYARROW_MIN_DOIS:
+            arr = pc.utf8_trim_whitespace(pa.array(list(chain(head, raw_iter)), type=pa.string()))
+            arr = pc.replace_substring_regex(arr, pattern=DOI_URL_PREFIX_RE2, replacement="")
+            arr = pc.utf8_trim_whitespace(arr)
+            return list(dict.fromkeys(filter(None, arr.to_pylist())))
+        raw_dois = head
+    # dict.fromkeys de-duplicates while keeping the first occurrence order.
+    return list(dict.fromkeys(filter(None, map(normalize_doi, raw_dois))))
+
+
+def _dumps(payload: dict) -> bytes:
+    """Serialize ``payload`` as compact UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(line: bytes) -> dict:
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
 
 
-def _normalize_doi(raw: str) -> str:
-    s = (raw or "").strip()
-    if not s:
-        return ""
-    # Strip common URL prefixes
-    lowered = s.lower()
-    if lowered.startswith("http://doi.org/") or lowered.startswith("https://doi.org/"):
-        return s.split("doi.org/")[-1].strip()
-    if lowered.startswith("http://dx.doi.org/") or lowered.startswith("https://dx.doi.org/"):
-        return s.split("dx.doi.org/")[-1].strip()
-    return s
+def _read_recorded_dois(events_path: Path) -> frozenset[str]:
+    """Return every DOI that already has an entry in the events log at ``events_path``."""
+    recorded: set[str] = set()
+    with events_path.open("rb") as fh:
+        for line in fh:
+            try:
+                recorded.add(_loads(line)["doi"])
+            except (ValueError, KeyError, TypeError):
+                # A run killed mid-write can leave a truncated last line behind.
+                continue
+    return frozenset(recorded)
+
+
+def _read_legacy_checkpoint(path: Path) -> Optional[int]:
+    """
+    Return ``last_completed_index`` when ``path`` holds a checkpoint written by older versions
+    of this script (one indented JSON object, not one event per line), else ``None``.
+    """
+    with path.open("rb") as fh:
+        if fh.readline().strip() != b"{":
+            return None
+        fh.seek(0)
+        try:
+            data = json.loads(fh.read())
+        except ValueError:
+            return None
+    if not isinstance(data, dict) or "last_completed_index" not in data:
+        return None
+    return int(data["last_completed_index"])
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -79,7 +172,7 @@ def build_parser() -> argparse.ArgumentParser:
         "--delay",
         type=float,
         default=DEFAULT_DELAY_SECONDS,
-        help="Seconds to wait between downloads (min 1.0, default 1.5)",
+        help="Seconds between downloads from the same publisher (min 1.0, default 1.5)",
     )
     parser.add_argument(
         "--max-per-publisher",
@@ -96,16 +189,63 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Inspect configuration and publisher routing without downloading any files.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=(
+            "Maximum number of lanes downloaded in parallel (default 4). "
+            "Each publisher gets --per-publisher-workers lanes; use 1 for a fully sequential run."
+        ),
+    )
+    parser.add_argument(
+        "--per-publisher-workers",
+        type=int,
+        default=1,
+        help=(
+            "Lanes per publisher (default 1, one DOI at a time). Higher values let downloads "
+            "from one publisher overlap, up to the library's per-publisher concurrency cap; "
+            "request starts stay spaced by --delay."
+        ),
+    )
+    parser.add_argument(
+        "--group-by-publisher",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help=(
+            "Group DOIs by publisher and DOI prefix so consecutive requests reuse the same "
+            "keep-alive connection (default). --no-group-by-publisher processes DOIs one at a "
+            "time in input order."
+        ),
+    )
     # Resilience and batching
     parser.add_argument(
         "--resume",
         action="store_true",
-        help="Resume from a checkpoint (created automatically after each successful DOI).",
+        help="Resume a previous run, skipping every DOI already recorded in the events log.",
+    )
+    parser.add_argument(
+        "--events-file",
+        type=Path,
+        help="Optional path to the JSONL events log. Default derives from --doi-file.",
     )
     parser.add_argument(
         "--checkpoint-file",
         type=Path,
-        help="Optional path to a checkpoint file. Default derives from --doi-file.",
+        help=(
+            "Checkpoint JSON written by older versions of this script. With --resume, DOIs up "
+            "to its last completed index count as done; new outcomes go to the events log. "
+            "Default derives from --doi-file."
+        ),
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=DEFAULT_CHECKPOINT_EVERY,
+        help=(
+            "Flush the events log after this many completed DOIs (default 10). "
+            "It is also flushed at least every 5 seconds while progressing and when the run ends."
+        ),
     )
     parser.add_argument(
         "--batch-size",
@@ -135,64 +275,63 @@ def main(argv: list[str] | None = None) -> None:
         format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
     )
 
-    raw_dois: list[str] = []
-    if args.doi:
-        raw_dois.extend(args.doi)
-    if args.doi_file:
-        if not args.doi_file.exists():
-            raise SystemExit(f"DOI file not found: {args.doi_file}")
-        for line in args.doi_file.read_text(encoding="utf-8").splitlines():
-            raw_dois.append(line)
-
-    normalized: list[str] = []
-    seen: set[str] = set()
-    for raw in raw_dois:
-        doi = _normalize_doi(raw)
-        if not doi:
-            continue
-        if doi not in seen:
-            seen.add(doi)
-            normalized.append(doi)
+    if args.doi_file and not args.doi_file.exists():
+        raise SystemExit(f"DOI file not found: {args.doi_file}")
+
+    normalized = _normalize_dois(_iter_raw_dois(args.doi, args.doi_file))
 
     if not normalized:
         raise SystemExit("At least one DOI is required. Use --doi or --doi-file.")
 
-    # Derive checkpoint and state paths
+    # Derive the events log path
     state_dir = Path("downloads/state")
     state_dir.mkdir(parents=True, exist_ok=True)
-    default_checkpoint_name = "multiple_dois.checkpoint.json"
-    if args.doi_file:
-        default_checkpoint_name = f"{args.doi_file.stem}.checkpoint.json"
-    checkpoint_path = args.checkpoint_file or (state_dir / default_checkpoint_name)
-    successes_path = state_dir / (checkpoint_path.stem.replace(".checkpoint", "") + "_successes.txt")
-    failures_path = state_dir / (checkpoint_path.stem.replace(".checkpoint", "") + "_failures.txt")
+    stem = args.doi_file.stem if args.doi_file else "multiple_dois"
+    events_path = args.events_file or (state_dir / f"{stem}.events.jsonl")
+    legacy_path = args.checkpoint_file or (state_dir / f"{stem}.checkpoint.json")
+    # Appending events to an old checkpoint would corrupt it and lose its progress.
+    if events_path.exists() and _read_legacy_checkpoint(events_path) is not None:
+        raise SystemExit(
+            f"{events_path} is a checkpoint from an older version of this script, not an "
+            "events log; pass it with --checkpoint-file and --resume instead."
+        )
 
     # Determine slice via resume or batching
     start_idx = 0
     end_idx = len(normalized)
-    if args.resume and checkpoint_path.exists():
+    recorded: frozenset[str] = frozenset()
+    if args.resume and events_path.exists():
         try:
-            data = json.loads(checkpoint_path.read_text(encoding="utf-8"))
-            last_idx = int(data.get("last_completed_index", -1))
-            start_idx = max(last_idx + 1, 0)
-            logging.info("Resuming from checkpoint %s (next index=%d)", checkpoint_path, start_idx)
-        except Exception as e:
-            logging.warning("Failed to read checkpoint %s: %s; starting from 0", checkpoint_path, e)
-            start_idx = 0
+            recorded = _read_recorded_dois(events_path)
+        except OSError as e:
+            LOGGER.warning("Failed to read events log %s: %s; starting from 0", events_path, e)
+    if args.resume and legacy_path.exists():
+        last_idx = _read_legacy_checkpoint(legacy_path)
+        if last_idx is None:
+            raise SystemExit(f"{legacy_path} is not a checkpoint written by this script.")
+        LOGGER.info(
+            "Treating DOIs up to index %d as done, from legacy checkpoint %s.", last_idx, legacy_path
+        )
+        recorded = recorded.union(normalized[: last_idx + 1])
+    if recorded:
+        # Lanes finish out of order, so resume at the first DOI without an event rather than
+        # after the highest recorded index; recorded DOIs further on are skipped below.
+        start_idx = next((i for i, doi in enumerate(normalized) if doi not in recorded), len(normalized))
+        LOGGER.info("Resuming with %d DOI(s) already done (next index=%d)", len(recorded), start_idx)
     if args.batch_size and args.batch_size > 0:
         start_idx = start_idx if args.resume else args.batch_index * args.batch_size
         end_idx = min(start_idx + args.batch_size, len(normalized))
-        logging.info("Batch selection: start=%d end=%d size=%d index=%d", start_idx, end_idx, args.batch_size, args.batch_index)
+        LOGGER.info("Batch selection: start=%d end=%d size=%d index=%d", start_idx, end_idx, args.batch_size, args.batch_index)
 
     selected = normalized[start_idx:end_idx]
     if not selected:
-        logging.info("No DOIs selected for this run (start=%d, end=%d).", start_idx, end_idx)
+        LOGGER.info("No DOIs selected for this run (start=%d, end=%d).", start_idx, end_idx)
         return
 
     downloads: list[Path] = []
     failures: list[str] = []
 
-    # Dry-run mode: plan without writing checkpoint or reports
+    # Dry-run mode: plan without writing the events log
     if args.dry_run:
         try:
             _ = list(
@@ -206,65 +345,132 @@ def main(argv: list[str] | None = None) -> None:
                 )
             )
         except DownloadError as exc:
-            logging.error("Dry run aborted: %s", exc)
+            LOGGER.error("Dry run aborted: %s", exc)
             raise SystemExit(1) from exc
-        logging.info("Dry run finished for %d DOI(s); no files were downloaded.", len(selected))
+        LOGGER.info("Dry run finished for %d DOI(s); no files were downloaded.", len(selected))
         return
 
-    # Process each DOI individually to support checkpointing and per-DOI reporting
+    # Process each DOI individually so every outcome lands in the events log.
+    # DOIs are grouped into one lane per publisher (or --per-publisher-workers lanes); lanes
+    # run in parallel while each lane stays sequential, and the per-publisher delay is honoured.
+    load_env_file()
+
+    # On resume, DOIs that already have an event are skipped up front instead of being
+    # routed through the downloader again.
+    lanes: dict[str, list[tuple[int, str]]] = {}
+    skipped: list[int] = []
     for idx, doi in enumerate(selected, start=start_idx):
-        try:
-            paths = list(
-                download_from_dois(
-                    dois=[doi],
-                    output_dir=args.output_dir,
-                    delay_seconds=args.delay,
-                    max_per_publisher=args.max_per_publisher,
-                    overwrite=args.overwrite,
-                    dry_run=False,
+        if doi in recorded:
+            skipped.append(idx)
+            continue
+        lane = (classify_publisher(doi) or "Unknown") if args.group_by_publisher else "input-order"
+        lanes.setdefault(lane, []).append((idx, doi))
+    dispatched = len(selected) - len(skipped)
+    if args.group_by_publisher:
+        # A publisher can own several DOI prefixes (hosts); keep each prefix contiguous.
+        for entries in lanes.values():
+            entries.sort(key=lambda entry: entry[1].split("/", 1)[0])
+        if args.per_publisher_workers > 1:
+            # Deal each publisher's DOIs round-robin over its lanes. The downloader's
+            # per-publisher pacer still spaces request starts by --delay across all of them.
+            split: dict[str, list[tuple[int, str]]] = {}
+            for publisher, entries in lanes.items():
+                cap = DEFAULT_PUBLISHER_CONCURRENCY.get(publisher.lower(), 1)
+                count = max(1, min(args.per_publisher_workers, cap, len(entries)))
+                for lane_index in range(count):
+                    split[f"{publisher}#{lane_index}"] = entries[lane_index::count]
+            lanes = split
+
+    # One adapter for the whole run so consecutive DOIs reuse keep-alive connections.
+    http_adapter = build_http_adapter()
+    results: queue.Queue = queue.Queue()
+    stop = threading.Event()
+
+    def _run_lane(entries: list[tuple[int, str]]) -> None:
+        for idx, doi in entries:
+            if stop.is_set():
+                return
+            try:
+                paths = list(
+                    download_from_dois(
+                        dois=[doi],
+                        output_dir=args.output_dir,
+                        delay_seconds=args.delay,
+                        max_per_publisher=args.max_per_publisher,
+                        overwrite=args.overwrite,
+                        dry_run=False,
+                        load_env=False,
+                        http_adapter=http_adapter,
+                        metadata_cache=metadata_cache,
+                    )
                 )
-            )
-            if paths:
-                downloads.extend(paths)
-                # Append report
-                with successes_path.open("a", encoding="utf-8") as fh:
-                    for p in paths:
-                        fh.write(f"{doi}\t{p}\n")
+            except Exception as exc:  # noqa: BLE001
+                results.put((idx, doi, [], exc))
             else:
-                failures.append(doi)
-                with failures_path.open("a", encoding="utf-8") as fh:
-                    fh.write(f"{doi}\tNO_OUTPUT\n")
-        except DownloadError as exc:
-            logging.warning("Download error for DOI %s: %s", doi, exc)
-            failures.append(doi)
-            with failures_path.open("a", encoding="utf-8") as fh:
-                fh.write(f"{doi}\tERROR:{exc}\n")
+                results.put((idx, doi, paths, None))
+
+    workers = max(1, min(args.workers, len(lanes)))
+    LOGGER.info(
+        "Dispatching %d DOI(s) across %d lane(s) with %d worker(s).",
+        dispatched,
+        len(lanes),
+        workers,
+    )
+    flush_every = max(args.checkpoint_every, 1)
+    unflushed = 0
+    last_flush = time.monotonic()
+
+    def record(event: dict) -> None:
+        nonlocal unflushed, last_flush
+        events_fh.write(_dumps(event) + b"\n")
+        unflushed += 1
+        if unflushed >= flush_every or time.monotonic() - last_flush > FLUSH_MAX_INTERVAL_SECONDS:
+            events_fh.flush()
+            unflushed = 0
+            last_flush = time.monotonic()
+
+    # The events log is the only state file: it stays open (and buffered) for the whole run,
+    # one JSON object per completed DOI. Every lane shares one metadata cache connection,
+    # which is closed only after the lanes have finished.
+    with closing(
+        MetadataCache(state_dir / METADATA_CACHE_FILENAME)
+    ) as metadata_cache, ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="doi-lane"
+    ) as executor, events_path.open("ab", buffering=REPORT_BUFFER_SIZE) as events_fh:
+        for entries in lanes.values():
+            executor.submit(_run_lane, entries)
+        try:
+            for _ in range(dispatched):
+                idx, doi, paths, error = results.get()
+                if error is not None:
+                    if not isinstance(error, DownloadError):
+                        raise error
+                    LOGGER.warning("Download error for DOI %s: %s", doi, error)
+                    failures.append(doi)
+                    record({"idx": idx, "doi": doi, "status": "error", "error": str(error)})
+                elif paths:
+                    downloads.extend(paths)
+                    record({"idx": idx, "doi": doi, "status": "ok", "paths": [str(p) for p in paths]})
+                else:
+                    failures.append(doi)
+                    record({"idx": idx, "doi": doi, "status": "no_output"})
         finally:
-            # Update checkpoint after each DOI
-            payload = {
-                "last_completed_index": idx,
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "total_dois": len(normalized),
-                "start_index_run": start_idx,
-                "end_index_run": end_idx,
-            }
-            try:
-                checkpoint_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-            except Exception as e:
-                logging.warning("Failed to write checkpoint %s: %s", checkpoint_path, e)
+            stop.set()
 
+    if skipped:
+        LOGGER.info("Skipped %d DOI(s) already recorded in %s.", len(skipped), events_path)
     if not downloads:
-        logging.info("No files downloaded.")
+        LOGGER.info("No files downloaded.")
         # Still summarize failures if any
         if failures:
-            logging.info("%d DOI(s) failed in this run.", len(failures))
+            LOGGER.info("%d DOI(s) failed in this run.", len(failures))
         return
 
-    for path in downloads:
-        print(path)
-    logging.info("Saved %d path(s).", len(downloads))
+    # One buffered write instead of a print() call per path.
+    sys.stdout.writelines(f"{path}\n" for path in downloads)
+    LOGGER.info("Saved %d path(s).", len(downloads))
     if failures:
-        logging.info("%d DOI(s) failed in this run. See: %s", len(failures), failures_path)
+        LOGGER.info("%d DOI(s) failed in this run. See: %s", len(failures), events_path)
 
 
 if __name__ == "__main__":
@@ -2,14 +2,32 @@
 High-level helpers for downloading publisher PDFs from Web of Science exports.
 """
 
-from .clients import (
-    CrossrefClient,
-    ElsevierClient,
-    OpenAlexClient,
-    SpringerClient,
-    WileyClient,
-)  # noqa: F401
-from .downloader import download_from_dois, download_from_savedrecs  # noqa: F401
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover - imported lazily at runtime
+    from .clients import (
+        CrossrefClient,
+        ElsevierClient,
+        OpenAlexClient,
+        SpringerClient,
+        WileyClient,
+    )
+    from .downloader import download_from_dois, download_from_savedrecs
+
+# Public names mapped to the submodule that defines them; loaded on first access (PEP 562)
+# so importing one submodule (e.g. ``auto_paper_download.sessions``) skips the rest.
+_LAZY_ATTRS = {
+    "CrossrefClient": ".clients",
+    "ElsevierClient": ".clients",
+    "OpenAlexClient": ".clients",
+    "SpringerClient": ".clients",
+    "WileyClient": ".clients",
+    "download_from_dois": ".downloader",
+    "download_from_savedrecs": ".downloader",
+}
 
 __all__ = [
     "CrossrefClient",
@@ -21,3 +39,16 @@ __all__ = [
     "download_from_savedrecs",
 ]
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
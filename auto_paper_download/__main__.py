@@ -6,12 +6,13 @@ from __future__ import annotations
 
 import argparse
 import logging
-from collections import defaultdict
+from collections import Counter
 from pathlib import Path
 from typing import Iterable
 
 from .clients import DownloadError
 from .downloader import DEFAULT_DELAY_SECONDS, download_from_savedrecs
+from .sessions import build_http_adapter
 
 LOGGER = logging.getLogger("auto_paper_download.cli")
 
@@ -38,11 +39,29 @@ def build_parser() -> argparse.ArgumentParser:
         default=Path("downloads/pdfs"),
         help="Directory where article folders (PDF + SI) will be saved (defaults to downloads/pdfs).",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path("downloads/state"),
+        help=(
+            "Directory where DOI lists parsed from each export are cached and reused while the "
+            "file is unchanged (defaults to downloads/state)."
+        ),
+    )
     parser.add_argument(
         "--delay",
         type=float,
         default=DEFAULT_DELAY_SECONDS,
-        help="Seconds to wait between downloads (min 1.0, default 1.1).",
+        help="Seconds between downloads from the same publisher (min 1.0, default 1.5).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help=(
+            "Number of records downloaded at once (default 1). Values above 1 overlap "
+            "downloads while keeping each publisher under its in-flight cap."
+        ),
     )
     parser.add_argument(
         "--max-per-publisher",
@@ -65,31 +84,28 @@ def build_parser() -> argparse.ArgumentParser:
 
 def _log_success(paths: Iterable[Path]) -> None:
     count = 0
-    for count, pdf_path in enumerate(paths, start=1):
-        LOGGER.info("Saved %s", pdf_path)
+    if LOGGER.isEnabledFor(logging.INFO):
+        for count, pdf_path in enumerate(paths, start=1):
+            LOGGER.info("Saved %s", pdf_path)
     if count == 0:
         LOGGER.info("No PDFs downloaded.")
 
 
-def _log_publisher_summary(metrics: dict[str, dict[str, int]]) -> None:
-    attempted = [
-        (publisher, stats)
-        for publisher, stats in metrics.items()
-        if stats.get("attempted", 0)
-    ]
-    if not attempted:
+def _log_publisher_summary(attempted: Counter[str], succeeded: Counter[str]) -> None:
+    publishers = [publisher for publisher, count in attempted.items() if count]
+    if not publishers:
         LOGGER.info("No publisher downloads were attempted; skipping summary.")
         return
 
     LOGGER.info("Publisher PDF download summary:")
-    for publisher, stats in sorted(attempted, key=lambda item: item[0].lower()):
-        total_attempted = stats.get("attempted", 0)
-        succeeded = stats.get("succeeded", 0)
-        rate = (succeeded / total_attempted * 100) if total_attempted else 0.0
+    for publisher in sorted(publishers, key=str.lower):
+        total_attempted = attempted[publisher]
+        total_succeeded = succeeded[publisher]
+        rate = total_succeeded / total_attempted * 100
         LOGGER.info(
             "  %s: %d/%d PDFs succeeded (%.1f%%)",
             publisher,
-            succeeded,
+            total_succeeded,
             total_attempted,
             rate,
         )
@@ -114,9 +130,9 @@ def main(argv: list[str] | None = None) -> None:
         raise SystemExit(f"savedrecs input file(s) not found: {joined}")
 
     downloads: list[Path] = []
-    aggregate_metrics: defaultdict[str, dict[str, int]] = defaultdict(
-        lambda: {"attempted": 0, "succeeded": 0}
-    )
+    http_adapter = build_http_adapter()
+    attempted: Counter[str] = Counter()
+    succeeded: Counter[str] = Counter()
     try:
         for savedrecs_path in savedrecs_paths:
             LOGGER.info("Processing input file %s", savedrecs_path)
@@ -127,15 +143,17 @@ def main(argv: list[str] | None = None) -> None:
                 max_per_publisher=args.max_per_publisher,
                 overwrite=args.overwrite,
                 dry_run=args.dry_run,
+                http_adapter=http_adapter,
+                cache_dir=args.cache_dir,
+                concurrency=args.concurrency,
             )
             downloaded_paths = list(download_iter)
             downloads.extend(downloaded_paths)
             iter_metrics = getattr(download_iter, "metrics", None)
             if iter_metrics:
                 for publisher, stats in iter_metrics.items():
-                    entry = aggregate_metrics[publisher]
-                    entry["attempted"] += stats.get("attempted", 0)
-                    entry["succeeded"] += stats.get("succeeded", 0)
+                    attempted[publisher] += stats.get("attempted", 0)
+                    succeeded[publisher] += stats.get("succeeded", 0)
     except DownloadError as exc:
         LOGGER.error("Download aborted: %s", exc)
         raise SystemExit(1) from exc
@@ -145,7 +163,7 @@ def main(argv: list[str] | None = None) -> None:
         return
 
     _log_success(downloads)
-    _log_publisher_summary(aggregate_metrics)
+    _log_publisher_summary(attempted, succeeded)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+"""
+Caches for publisher responses: an in-memory one for searches and an on-disk one for DOI metadata.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Hashable, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib json module is used otherwise
+    orjson = None
+
+DEFAULT_CACHE_TTL = 3600.0
+DEFAULT_CACHE_SIZE = 512
+DEFAULT_METADATA_TTL = 86400.0
+METADATA_CACHE_FILENAME = "metadata.sqlite3"
+
+
+class QueryCache:
+    """
+    Thread-safe mapping of query keys to results that expire after ``default_ttl`` seconds.
+
+    When ``max_size`` entries are stored, the oldest tenth is evicted to make room.
+    """
+
+    def __init__(
+        self,
+        *,
+        default_ttl: float = DEFAULT_CACHE_TTL,
+        max_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        self._default_ttl = default_ttl
+        self._max_size = max(max_size, 1)
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key``, or ``None`` when it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any, *, ttl: Optional[float] = None) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds (``default_ttl`` when omitted)."""
+        expires_at = time.monotonic() + (self._default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self._max_size:
+                # dicts keep insertion order, so the first keys are the oldest entries.
+                for stale in list(self._entries)[: max(self._max_size // 10, 1)]:
+                    del self._entries[stale]
+            self._entries[key] = (expires_at, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class MetadataCache:
+    """
+    SQLite-backed store of metadata payloads keyed by ``(source, doi)``, shared across runs.
+
+    Entries older than ``ttl`` seconds are treated as missing. One connection is shared by
+    all threads and serialized with a lock.
+    """
+
+    def __init__(self, path: Path, *, ttl: float = DEFAULT_METADATA_TTL) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS metadata ("
+            "source TEXT NOT NULL, doi TEXT NOT NULL, fetched_at REAL NOT NULL, "
+            "payload TEXT NOT NULL, PRIMARY KEY (source, doi))"
+        )
+
+    def get(self, source: str, doi: str) -> Optional[dict]:
+        """Return the cached payload for ``doi`` from ``source``, or ``None`` when missing or stale."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, payload FROM metadata WHERE source = ? AND doi = ?",
+                (source, doi.lower()),
+            ).fetchone()
+        if row is None or row[0] + self._ttl <= time.time():
+            return None
+        return orjson.loads(row[1]) if orjson is not None else json.loads(row[1])
+
+    def set(self, source: str, doi: str, payload: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (source, doi, fetched_at, payload) VALUES (?, ?, ?, ?)",
+                (source, doi.lower(), time.time(), _dump_payload(payload)),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _dump_payload(payload: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(payload).decode("utf-8")
+    return json.dumps(payload, separators=(",", ":"))
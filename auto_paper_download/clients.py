@@ -1,16 +1,47 @@
+import asyncio
 import logging
 import os
+import queue
+import random
 import re
+import sys
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache, partial, wraps
 from pathlib import Path
-from typing import Iterable, Iterator, MutableMapping, Optional, Sequence
-from urllib.parse import quote
+from typing import (
+    AbstractSet,
+    AsyncIterator,
+    Callable,
+    ClassVar,
+    Generator,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Sized,
+    TypeVar,
+)
+from urllib.parse import quote, urlsplit
 import time
 
 import requests
 from requests.utils import parse_header_links
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional speed-up; requests' stdlib json decoding is used otherwise
+    orjson = None
+
+from .cache import MetadataCache, QueryCache
+from .ratelimit import KeyedBuckets, host_bucket, parse_rate_limit
+from .sessions import RESUMABLE_STATUS_CODES, build_session, resume_headers, stream_to_file
 from .supplements import download_supplements_for_doi
 
 LOGGER = logging.getLogger(__name__)
@@ -18,8 +49,38 @@ LOGGER = logging.getLogger(__name__)
 DEFAULT_USER_AGENT = "AutoPaperDownload/0.1.0 (+https://github.com/ChemBioHTP/EnzyExtract)"
 DEFAULT_CROSSREF_REQUEST_DELAY = 4.0
 DEFAULT_WILEY_REQUEST_DELAY = 2.5
+DEFAULT_BATCH_CONCURRENCY = 16
+# In-flight record limits per publisher for the concurrent batched downloads (matched against
+# ``ArticleRecord.publisher`` the same way the download routing does).
+DEFAULT_PUBLISHER_CONCURRENCY = {"elsevier": 6, "wiley": 8, "springer": 4, "crossref": 4}
+# Batches with fewer records than this stat each record's directory instead of listing the
+# whole output root first; the multi-DOI script sends one DOI per batch.
+PRESCAN_MIN_RECORDS = 32
 
 _SAFE_PATH_CHARS = re.compile(r"[^0-9A-Za-z._-]+")
+# Shared stand-ins for missing search fields, so the per-entry loops allocate nothing on a miss.
+_EMPTY_MAPPING: dict = {}
+_EMPTY_LINKS = ({"@href": None},)
+# ``slots=True`` needs Python 3.10; older interpreters fall back to a regular dataclass.
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+# Directories created by :func:`_ensure_dir` during this process.
+_ENSURED_DIRS: set[Path] = set()
+_ENSURED_DIRS_LOCK = threading.Lock()
+# Article directories being downloaded right now, with the number of records using each slot.
+_INFLIGHT: dict[Path, threading.Lock] = {}
+_INFLIGHT_USERS: Counter[Path] = Counter()
+_INFLIGHT_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _env_setting(name: str) -> Optional[str]:
+    """
+    Cached ``os.getenv`` for client credentials and tuning knobs.
+
+    Call ``_env_setting.cache_clear()`` after changing ``os.environ``; ``load_env_file``
+    does this whenever it loads new values.
+    """
+    return os.getenv(name)
 
 
 def _response_preview(response: requests.Response, *, limit: int = 160) -> str:
@@ -78,23 +139,58 @@ def _response_header_snapshot(
     return headers
 
 
+def _json_payload(response: requests.Response):
+    """
+    Decode a JSON API response, using orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+@lru_cache(maxsize=8192)
 def _safe_identifier(identifier: str) -> str:
     """
     Collapse characters that Windows filesystems reject into underscores, while preserving dots.
+
+    Cached because each record resolves its identifier more than once (existing-file check,
+    then the publisher branch).
     """
-    cleaned = _SAFE_PATH_CHARS.sub("_", identifier)
-    cleaned = cleaned.strip("._")
-    if not cleaned:
-        cleaned = "article"
-    return cleaned[:150]
+    return _SAFE_PATH_CHARS.sub("_", identifier).strip("._")[:150] or "article"
+
+
+def _ensure_dir(path: Path) -> bool:
+    """
+    Create ``path`` (and its parents) unless this process already did or saw it exist.
+
+    An article directory is resolved by the routing code and again by ``download_pdf``;
+    remembering it saves the repeated ``mkdir`` calls. Returns ``True`` only when this call
+    created the directory. If a remembered directory is deleted later, ``stream_to_file``
+    recreates it when it writes there.
+    """
+    if path in _ENSURED_DIRS:
+        return False
+    try:
+        path.mkdir(parents=True)
+        created = True
+    except FileExistsError:
+        if not path.is_dir():
+            raise
+        created = False
+    with _ENSURED_DIRS_LOCK:
+        _ENSURED_DIRS.add(path)
+    return created
 
 
 def _article_destination(article_dir: Path, base_name: str) -> Path:
     """
     Resolve the primary PDF path inside ``article_dir`` and migrate legacy article.pdf if present.
     """
-    article_dir.mkdir(parents=True, exist_ok=True)
+    created = _ensure_dir(article_dir)
     destination = article_dir / f"{base_name}.pdf"
+    if created:
+        # A directory made just now cannot hold a legacy download.
+        return destination
     legacy = article_dir / "article.pdf"
     if legacy.exists() and not destination.exists():
         try:
@@ -104,6 +200,47 @@ def _article_destination(article_dir: Path, base_name: str) -> Path:
     return destination
 
 
+def _scan_article_dirs(output_root: Path) -> frozenset[str]:
+    """
+    Return the names of the article directories already present under ``output_root``.
+
+    The listing also tells :func:`_ensure_dir` which directories exist, so records that
+    resume into them skip their ``mkdir`` call; only new article directories are created.
+    """
+    try:
+        with os.scandir(output_root) as entries:
+            names = frozenset(entry.name for entry in entries if entry.is_dir())
+    except FileNotFoundError:
+        return frozenset()
+    with _ENSURED_DIRS_LOCK:
+        _ENSURED_DIRS.update(output_root / name for name in names)
+    return names
+
+
+def _batch_article_dirs(
+    records: Iterable["ArticleRecord"],
+    output_root: Path,
+    *,
+    overwrite: bool,
+    existing_dirs: Optional[AbstractSet[str]] = None,
+) -> Optional[AbstractSet[str]]:
+    """
+    Return the directory listing a batch checks for existing PDFs, or ``None`` to stat each record.
+
+    A listing passed in by the caller (one scan for a whole run) is used as is. Otherwise
+    the output root is listed only for batches of unknown size or of at least
+    ``PRESCAN_MIN_RECORDS`` records, so small batches called many times in a row do not
+    list every article folder on each call.
+    """
+    if overwrite:
+        return None
+    if existing_dirs is not None:
+        return existing_dirs
+    if isinstance(records, Sized) and len(records) < PRESCAN_MIN_RECORDS:
+        return None
+    return _scan_article_dirs(output_root)
+
+
 def _cleanup_article_dir(article_dir: Path) -> None:
     """
     Remove ``article_dir`` if it exists and contains no files after a failed download.
@@ -111,15 +248,86 @@ def _cleanup_article_dir(article_dir: Path) -> None:
     try:
         if article_dir.is_dir() and not any(article_dir.iterdir()):
             article_dir.rmdir()
+            with _ENSURED_DIRS_LOCK:
+                _ENSURED_DIRS.discard(article_dir)
     except OSError:  # noqa: PERF203
         LOGGER.debug("Failed to remove empty article directory: %s", article_dir, exc_info=True)
 
 
+@contextmanager
+def _single_flight(article_dir: Path) -> Iterator[bool]:
+    """
+    Hold the download slot for ``article_dir``, yielding ``True`` if another record held it first.
+
+    Concurrent records for the same article (duplicate DOIs, or overlapping batches in one
+    process) then fetch it one at a time, and the later ones can reuse the saved PDF.
+    """
+    with _INFLIGHT_LOCK:
+        slot = _INFLIGHT.setdefault(article_dir, threading.Lock())
+        _INFLIGHT_USERS[article_dir] += 1
+    waited = not slot.acquire(blocking=False)
+    if waited:
+        slot.acquire()
+    try:
+        yield waited
+    finally:
+        slot.release()
+        with _INFLIGHT_LOCK:
+            _INFLIGHT_USERS[article_dir] -= 1
+            if not _INFLIGHT_USERS[article_dir]:
+                del _INFLIGHT_USERS[article_dir], _INFLIGHT[article_dir]
+
+
 class DownloadError(RuntimeError):
     """Raised when a publisher download or search request fails."""
 
 
-@dataclass
+_F = TypeVar("_F", bound=Callable)
+
+# Failures while reading a streamed body; the adapter's Retry policy only covers the request
+# itself (connection setup and response status), not the transfer that follows.
+_STREAM_ERRORS = (
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+
+def _with_retry(*, max_attempts: int = 3, backoff: float = 0.5) -> Callable[[_F], _F]:
+    """
+    Retry a ``download_pdf`` method when the PDF body transfer breaks off mid-stream.
+
+    Waits ``backoff * 2**attempt`` seconds plus jitter between attempts, then reports the
+    last failure as a :class:`DownloadError`.
+    """
+
+    def decorator(func: _F) -> _F:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(max_attempts):
+                try:
+                    return func(*args, **kwargs)
+                except _STREAM_ERRORS as exc:
+                    if attempt + 1 >= max_attempts:
+                        raise DownloadError(
+                            f"PDF transfer failed after {max_attempts} attempts: {exc}"
+                        ) from exc
+                    delay = backoff * 2**attempt + random.uniform(0, 0.5)
+                    LOGGER.warning(
+                        "PDF transfer interrupted (%s); retrying in %.1fs (attempt %d/%d)",
+                        exc,
+                        delay,
+                        attempt + 2,
+                        max_attempts,
+                    )
+                    time.sleep(delay)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class ArticleRecord:
     """Minimal metadata returned by the publisher search APIs."""
 
@@ -144,6 +352,8 @@ class WileyClient:
     """
 
     BASE_URL = "https://api.wiley.com/onlinelibrary/tdm/v1"
+    _ARTICLE_PREFIX = BASE_URL + "/articles/"
+    _PDF_HEADERS: ClassVar[dict[str, str]] = {"Accept": "application/pdf"}
 
     def __init__(
         self,
@@ -151,15 +361,17 @@ class WileyClient:
         token: Optional[str] = None,
         session: Optional[requests.Session] = None,
         user_agent: str = DEFAULT_USER_AGENT,
+        search_cache: Optional[QueryCache] = None,
     ) -> None:
-        token = token or os.getenv("WILEY_TDM_TOKEN")
+        token = token or _env_setting("WILEY_TDM_TOKEN")
         if not token:
             raise ValueError(
                 "WileyClient requires a token. Set WILEY_TDM_TOKEN or pass token= explicitly."
             )
 
         self._token = token
-        self._session = session or requests.Session()
+        self._session = session or build_session()
+        self._search_cache = search_cache or QueryCache()
         self._session.headers.update(
             {
                 "Wiley-TDM-Client-Token": token,
@@ -168,7 +380,7 @@ class WileyClient:
             }
         )
 
-        delay_env = os.getenv("WILEY_REQUEST_DELAY")
+        delay_env = _env_setting("WILEY_REQUEST_DELAY")
         delay_value = None
         if delay_env:
             try:
@@ -201,6 +413,12 @@ class WileyClient:
         subject_area:
             Optional subject filter (see Wiley documentation for accepted values).
         """
+        cache_key = (query, limit, start, subject_area)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            LOGGER.debug("Wiley search cache hit: %s", cache_key)
+            return list(cached)
+
         params: dict[str, str | int] = {"q": query, "limit": limit, "offset": start}
         if subject_area:
             params["subject"] = subject_area
@@ -214,26 +432,48 @@ class WileyClient:
                 f"Wiley search failed ({response.status_code}): {_response_preview(response)}"
             )
 
-        payload = response.json()
-        items = payload.get("items", [])
-        records: list[ArticleRecord] = []
-        for item in items:
-            identifiers = item.get("identifiers", {})
-            doi = identifiers.get("doi")
-            pii = identifiers.get("pii")
-            pmid = identifiers.get("pmid")
-            records.append(
-                ArticleRecord(
-                    title=item.get("title", ""),
-                    doi=doi,
-                    pii=pii,
-                    pmid=pmid,
-                    url=item.get("link"),
-                    publisher="Wiley",
-                )
+        payload = _json_payload(response)
+        records = [
+            ArticleRecord(
+                title=item.get("title", ""),
+                doi=(identifiers := item.get("identifiers") or _EMPTY_MAPPING).get("doi"),
+                pii=identifiers.get("pii"),
+                pmid=identifiers.get("pmid"),
+                url=item.get("link"),
+                publisher="Wiley",
             )
+            for item in payload.get("items", [])
+        ]
+        self._search_cache.set(cache_key, tuple(records))
         return records
 
+    def iter_search(
+        self,
+        *,
+        query: str,
+        page_size: int = 100,
+        subject_area: Optional[str] = None,
+        max_records: Optional[int] = None,
+    ) -> Iterator[ArticleRecord]:
+        """
+        Yield every record matching ``query``, requesting the next page only once the
+        current one has been consumed.
+
+        Stops after ``max_records`` records when given, or at the first short page.
+        """
+        start = 0
+        remaining = max_records
+        while remaining is None or remaining > 0:
+            limit = page_size if remaining is None else min(page_size, remaining)
+            page = self.search(query=query, limit=limit, start=start, subject_area=subject_area)
+            yield from page
+            if remaining is not None:
+                remaining -= len(page)
+            if len(page) < limit:
+                return
+            start += len(page)
+
+    @_with_retry()
     def download_pdf(
         self,
         *,
@@ -248,13 +488,17 @@ class WileyClient:
             LOGGER.info("Skipping existing file: %s", destination)
             return destination
 
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        url = f"{self.BASE_URL}/articles/{doi}"
+        _ensure_dir(destination.parent)
+        url = self._ARTICLE_PREFIX + doi
         LOGGER.debug("Wiley download: %s -> %s", url, destination)
-        headers = {"Accept": "application/pdf"}
         self._throttle()
         try:
-            response = self._session.get(url, headers=headers, timeout=120, stream=True)
+            response = self._session.get(
+                url,
+                headers=resume_headers(destination, url, self._PDF_HEADERS),
+                timeout=120,
+                stream=True,
+            )
         except requests.exceptions.TooManyRedirects:
             raise DownloadError(
                 f"Wiley download failed for DOI {doi}: URL redirected too many times"
@@ -263,15 +507,12 @@ class WileyClient:
             raise DownloadError(
                 f"Wiley download failed for DOI {doi}: {exc}"
             )
-        if response.status_code != requests.codes.ok:
+        if response.status_code not in RESUMABLE_STATUS_CODES:
             raise DownloadError(
                 f"Wiley download failed ({response.status_code}): {_response_preview(response)}"
             )
 
-        with destination.open("wb") as fout:
-            for chunk in response.iter_content(chunk_size=65536):
-                if chunk:
-                    fout.write(chunk)
+        stream_to_file(response, destination, resume_url=url)
         return destination
 
     def _throttle(self) -> None:
@@ -299,11 +540,12 @@ class SpringerClient:
         api_key: Optional[str] = None,
         session: Optional[requests.Session] = None,
         user_agent: str = DEFAULT_USER_AGENT,
+        metadata_cache: Optional[MetadataCache] = None,
     ) -> None:
         api_key = (
             api_key
-            or os.getenv("SPRINGER_API_KEY")
-            or os.getenv("SPRINGER_NATURE_API_KEY")
+            or _env_setting("SPRINGER_API_KEY")
+            or _env_setting("SPRINGER_NATURE_API_KEY")
         )
         if not api_key:
             raise ValueError(
@@ -312,7 +554,9 @@ class SpringerClient:
             )
 
         self._api_key = api_key
-        self._session = session or requests.Session()
+        self._session = session or build_session()
+        self._metadata_cache = metadata_cache
+        self._recent_metadata = QueryCache()
         self._session.headers.update(
             {
                 "User-Agent": user_agent,
@@ -343,21 +587,17 @@ class SpringerClient:
                 f"Springer search failed ({response.status_code}): {_response_preview(response)}"
             )
 
-        payload = response.json()
-        records: list[ArticleRecord] = []
-        for item in payload.get("records", []):
-            doi = item.get("doi")
-            url_entries = item.get("url", [])
-            pdf_url = self._select_pdf_url(url_entries)
-            records.append(
-                ArticleRecord(
-                    title=item.get("title", ""),
-                    doi=doi,
-                    url=pdf_url,
-                    publisher="Springer",
-                )
+        payload = _json_payload(response)
+        select_pdf_url = self._select_pdf_url
+        return [
+            ArticleRecord(
+                title=item.get("title", ""),
+                doi=item.get("doi"),
+                url=select_pdf_url(item.get("url", [])),
+                publisher="Springer",
             )
-        return records
+            for item in payload.get("records", [])
+        ]
 
     def download_pdf(
         self,
@@ -377,11 +617,14 @@ class SpringerClient:
         if not pdf_url:
             raise DownloadError(f"No PDF URL available for Springer DOI {doi}")
 
-        destination.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(destination.parent)
         LOGGER.debug("Springer download: %s -> %s", pdf_url, destination)
         try:
             response = self._session.get(
-                pdf_url, headers={"Accept": "application/pdf"}, timeout=120, stream=True
+                pdf_url,
+                headers=resume_headers(destination, pdf_url, {"Accept": "application/pdf"}),
+                timeout=120,
+                stream=True,
             )
         except requests.exceptions.TooManyRedirects:
             raise DownloadError(
@@ -391,18 +634,31 @@ class SpringerClient:
             raise DownloadError(
                 f"Springer download failed for DOI {doi}: {exc}"
             )
-        if response.status_code != requests.codes.ok:
+        if response.status_code not in RESUMABLE_STATUS_CODES:
             raise DownloadError(
                 f"Springer download failed ({response.status_code}): {_response_preview(response)}"
             )
 
-        with destination.open("wb") as fout:
-            for chunk in response.iter_content(chunk_size=65536):
-                if chunk:
-                    fout.write(chunk)
+        stream_to_file(response, destination, resume_url=pdf_url)
         return destination
 
+    def prefetch_metadata(self, doi: str) -> None:
+        """
+        Look up ``doi`` ahead of :meth:`download_pdf` so the download can reuse the result.
+
+        Failures are only logged; :meth:`download_pdf` repeats the lookup and reports them.
+        """
+        try:
+            self._fetch_metadata_for_doi(doi)
+        except (DownloadError, requests.exceptions.RequestException) as exc:
+            LOGGER.debug("Springer metadata prefetch failed for %s: %s", doi, exc)
+
     def _fetch_metadata_for_doi(self, doi: str) -> dict:
+        cached = self._recent_metadata.get(doi)
+        if cached is None and self._metadata_cache is not None:
+            cached = self._metadata_cache.get("springer", doi)
+        if cached is not None:
+            return cached
         params = {"q": f"doi:{doi}", "p": 1, "api_key": self._api_key}
         LOGGER.debug("Springer metadata lookup params=%s", params)
         response = self._session.get(self.METADATA_URL, params=params, timeout=60)
@@ -413,18 +669,25 @@ class SpringerClient:
             raise DownloadError(
                 f"Springer metadata lookup failed ({response.status_code}): {_response_preview(response)}"
             )
-        payload = response.json()
+        payload = _json_payload(response)
         records = payload.get("records", [])
         if not records:
             raise DownloadError(f"Springer metadata not found for DOI {doi}")
+        self._recent_metadata.set(doi, records[0])
+        if self._metadata_cache is not None:
+            self._metadata_cache.set("springer", doi, records[0])
         return records[0]
 
     @staticmethod
     def _select_pdf_url(url_entries: list[dict]) -> Optional[str]:
-        for entry in url_entries:
-            if entry.get("format", "").lower() == "pdf" and entry.get("value"):
-                return entry["value"]
-        return None
+        return next(
+            (
+                entry["value"]
+                for entry in url_entries
+                if entry.get("value") and (entry.get("format") or "").lower() == "pdf"
+            ),
+            None,
+        )
 
     @staticmethod
     def _fallback_pdf_url(doi: str) -> Optional[str]:
@@ -446,6 +709,12 @@ class CrossrefClient:
 
     WORK_URL_TEMPLATE = "https://api.crossref.org/works/{doi}"
     DOI_RESOLVER_TEMPLATE = "https://doi.org/{doi}"
+    # Per-DOI URLs are built by concatenation; the templates above document their shape.
+    _WORK_URL_PREFIX: ClassVar[str] = WORK_URL_TEMPLATE.format(doi="")
+    _DOI_RESOLVER_PREFIX: ClassVar[str] = DOI_RESOLVER_TEMPLATE.format(doi="")
+    WORKS_URL = "https://api.crossref.org/works"
+    # DOIs per ``/works?filter=doi:...`` request in :meth:`prefetch_metadata_many`.
+    BULK_LOOKUP_SIZE = 100
     UNIXSD_ACCEPT = "application/vnd.crossref.unixsd+xml"
 
     def __init__(
@@ -456,24 +725,28 @@ class CrossrefClient:
         session: Optional[requests.Session] = None,
         user_agent: str = DEFAULT_USER_AGENT,
         request_delay: Optional[float] = None,
+        metadata_cache: Optional[MetadataCache] = None,
     ) -> None:
-        mailto = mailto or os.getenv("CROSSREF_MAILTO")
+        mailto = mailto or _env_setting("CROSSREF_MAILTO")
         if not mailto:
             raise ValueError(
                 "CrossrefClient requires a contact email. "
                 "Set CROSSREF_MAILTO or pass mailto= explicitly."
             )
 
-        env_safelist = os.getenv("CROSSREF_LICENSE_SAFELIST")
+        env_safelist = _env_setting("CROSSREF_LICENSE_SAFELIST")
         safelist = list(license_safelist or [])
         if env_safelist:
             safelist.extend(
                 entry.strip() for entry in env_safelist.split(",") if entry.strip()
             )
-        self._license_safelist = [entry.lower() for entry in safelist] or None
+        self._license_safelist = tuple(entry.lower() for entry in safelist) or None
 
         self._mailto = mailto
-        self._session = session or requests.Session()
+        self._session = session or build_session()
+        self._metadata_cache = metadata_cache
+        self._recent_metadata = QueryCache()
+        self._link_header_urls = QueryCache(max_size=2048)
         ua_with_contact = f"{user_agent} (mailto:{self._mailto})"
         self._session.headers.update(
             {
@@ -481,7 +754,7 @@ class CrossrefClient:
                 "Accept": "application/json",
             }
         )
-        delay_env = os.getenv("CROSSREF_REQUEST_DELAY")
+        delay_env = _env_setting("CROSSREF_REQUEST_DELAY")
         delay_value = request_delay
         if delay_env:
             try:
@@ -518,12 +791,15 @@ class CrossrefClient:
         if not pdf_url:
             raise DownloadError(f"No PDF link found via Crossref for DOI {doi}")
 
-        destination.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(destination.parent)
         LOGGER.debug("Crossref download: %s -> %s", pdf_url, destination)
-        self._throttle()
+        self._throttle(pdf_url)
         try:
             response = self._session.get(
-                pdf_url, headers={"Accept": "application/pdf"}, timeout=120, stream=True
+                pdf_url,
+                headers=resume_headers(destination, pdf_url, {"Accept": "application/pdf"}),
+                timeout=120,
+                stream=True,
             )
         except requests.exceptions.TooManyRedirects:
             raise DownloadError(
@@ -533,7 +809,7 @@ class CrossrefClient:
             raise DownloadError(
                 f"Crossref download failed for DOI {doi}: {exc}"
             )
-        if response.status_code != requests.codes.ok:
+        if response.status_code not in RESUMABLE_STATUS_CODES:
             body_text = response.text or ""
             if response.status_code == 403 and "Just a moment" in body_text:
                 message = f"Crossref download blocked by Cloudflare (403) for DOI {doi}"
@@ -544,18 +820,79 @@ class CrossrefClient:
                 )
             raise DownloadError(message)
 
-        with destination.open("wb") as fout:
-            for chunk in response.iter_content(chunk_size=65536):
-                if chunk:
-                    fout.write(chunk)
+        stream_to_file(response, destination, resume_url=pdf_url)
         return destination
 
+    def prefetch_metadata(self, doi: str) -> None:
+        """
+        Look up ``doi`` ahead of :meth:`download_pdf` so the download can reuse the result.
+
+        Failures are only logged; :meth:`download_pdf` repeats the lookup and reports them.
+        """
+        try:
+            self._fetch_work_metadata(doi)
+        except (DownloadError, requests.exceptions.RequestException) as exc:
+            LOGGER.debug("Crossref metadata prefetch failed for %s: %s", doi, exc)
+
+    def prefetch_metadata_many(self, dois: Iterable[str]) -> None:
+        """
+        Look up many DOIs with one ``/works?filter=doi:...`` request per ``BULK_LOOKUP_SIZE``.
+
+        Results go to the same caches :meth:`download_pdf` reads, so those downloads skip
+        their own metadata request. DOIs the query does not return are left to the per-DOI
+        lookup; failures are only logged.
+        """
+        pending = [
+            doi for doi in dict.fromkeys(dois) if "," not in doi and self._cached_work(doi) is None
+        ]
+        for start in range(0, len(pending), self.BULK_LOOKUP_SIZE):
+            chunk = {doi.lower(): doi for doi in pending[start : start + self.BULK_LOOKUP_SIZE]}
+            params = {
+                "filter": ",".join(f"doi:{doi}" for doi in chunk.values()),
+                "rows": len(chunk),
+                "mailto": self._mailto,
+            }
+            LOGGER.debug("Crossref bulk metadata lookup for %d DOI(s)", len(chunk))
+            try:
+                self._throttle(self.WORKS_URL)
+                response = self._session.get(self.WORKS_URL, params=params, timeout=60)
+                self._retune_from_headers(self.WORKS_URL, response)
+                if response.status_code != requests.codes.ok:
+                    raise DownloadError(
+                        f"Crossref bulk metadata lookup failed ({response.status_code}): "
+                        f"{_response_preview(response)}"
+                    )
+                items = _json_payload(response).get("message", {}).get("items") or []
+            except (DownloadError, requests.exceptions.RequestException, ValueError) as exc:
+                LOGGER.debug("Crossref bulk metadata prefetch failed: %s", exc)
+                continue
+            for work in items:
+                doi = chunk.get(str(work.get("DOI") or "").lower())
+                if doi is not None:
+                    self._remember_work(doi, work)
+
+    def _cached_work(self, doi: str) -> Optional[dict]:
+        cached = self._recent_metadata.get(doi)
+        if cached is None and self._metadata_cache is not None:
+            cached = self._metadata_cache.get("crossref", doi)
+        return cached
+
+    def _remember_work(self, doi: str, work: dict) -> None:
+        self._recent_metadata.set(doi, work)
+        if self._metadata_cache is not None:
+            self._metadata_cache.set("crossref", doi, work)
+
     def _fetch_work_metadata(self, doi: str) -> dict:
-        url = self.WORK_URL_TEMPLATE.format(doi=doi)
+        # A cache hit skips the request and its throttle delay.
+        cached = self._cached_work(doi)
+        if cached is not None:
+            return cached
+        url = self._WORK_URL_PREFIX + doi
         params = {"mailto": self._mailto}
         LOGGER.debug("Crossref metadata lookup %s params=%s", url, params)
-        self._throttle()
+        self._throttle(url)
         response = self._session.get(url, params=params, timeout=60)
+        self._retune_from_headers(url, response)
         if response.status_code != requests.codes.ok:
             body_text = response.text or ""
             if response.status_code == 403 and "Just a moment" in body_text:
@@ -566,8 +903,9 @@ class CrossrefClient:
                     f"{_response_preview(response)}"
                 )
             raise DownloadError(message)
-        payload = response.json()
-        return payload.get("message", {})
+        work = _json_payload(response).get("message", {})
+        self._remember_work(doi, work)
+        return work
 
     def _license_allowed(self, work: dict) -> bool:
         if not self._license_safelist:
@@ -577,58 +915,57 @@ class CrossrefClient:
         if not licenses:
             return False
 
-        now = datetime.now(timezone.utc)
+        now_ms = time.time() * 1000
         for entry in licenses:
             url = (entry.get("URL") or "").lower()
-            if not url:
-                continue
-            if not self._is_license_active(entry, now):
-                continue
-            if any(url.startswith(prefix) for prefix in self._license_safelist):
+            # One C-level prefix test first; the start-date parsing is only needed on a match.
+            if url.startswith(self._license_safelist) and self._is_license_active(entry, now_ms):
                 return True
         return False
 
     @staticmethod
-    def _is_license_active(entry: dict, now: datetime) -> bool:
+    def _is_license_active(entry: dict, now_ms: float) -> bool:
+        # Crossref start timestamps are epoch milliseconds, so they compare with ``now_ms``
+        # directly; only entries without one need a datetime built from ``date-parts``.
         start = entry.get("start")
-        if not start:
+        if not start or not isinstance(start, dict):
             return True
         timestamp = start.get("timestamp")
         if timestamp is not None:
             try:
-                start_dt = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
-            except Exception:  # noqa: BLE001
-                start_dt = None
-        else:
-            date_parts = start.get("date-parts") if isinstance(start, dict) else None
-            start_dt = None
-            if date_parts:
-                parts = date_parts[0]
-                year = parts[0]
-                month = parts[1] if len(parts) > 1 else 1
-                day = parts[2] if len(parts) > 2 else 1
-                try:
-                    start_dt = datetime(year, month, day, tzinfo=timezone.utc)
-                except ValueError:
-                    start_dt = None
-        if not start_dt:
+                return float(timestamp) <= now_ms
+            except (TypeError, ValueError):
+                return True
+        date_parts = start.get("date-parts")
+        if not date_parts or not date_parts[0]:
             return True
-        return start_dt <= now
+        parts = date_parts[0]
+        try:
+            start_dt = datetime(
+                parts[0],
+                parts[1] if len(parts) > 1 else 1,
+                parts[2] if len(parts) > 2 else 1,
+                tzinfo=timezone.utc,
+            )
+        except (TypeError, ValueError):
+            return True
+        return start_dt.timestamp() * 1000 <= now_ms
 
     @staticmethod
     def _preferred_link(links: list[dict]) -> Optional[str]:
-        candidates: list[tuple[int, str]] = []
+        # First text-mining PDF link, else the first PDF link of any kind.
+        fallback: Optional[str] = None
         for link in links:
-            if (
-                (link.get("content-type") or "").lower() == "application/pdf"
-                and link.get("URL")
-            ):
-                priority = 0 if link.get("intended-application") == "text-mining" else 1
-                candidates.append((priority, link["URL"]))
-        if not candidates:
-            return None
-        candidates.sort(key=lambda item: item[0])
-        return candidates[0][1]
+            if (link.get("content-type") or "").lower() != "application/pdf":
+                continue
+            url = link.get("URL")
+            if not url:
+                continue
+            if link.get("intended-application") == "text-mining":
+                return url
+            if fallback is None:
+                fallback = url
+        return fallback
 
     def _select_pdf_url(self, work: dict) -> Optional[str]:
         links = work.get("link") or []
@@ -637,11 +974,27 @@ class CrossrefClient:
         return self._preferred_link(links)
 
     def _extract_pdf_from_link_header(self, doi: str) -> Optional[str]:
-        url = self.DOI_RESOLVER_TEMPLATE.format(doi=doi)
+        # Misses are cached too ("" stands for "no PDF link"), so a DOI is probed once per client.
+        cached = self._link_header_urls.get(doi)
+        if cached is None and self._metadata_cache is not None:
+            stored = self._metadata_cache.get("crossref-link", doi)
+            if stored is not None:
+                cached = stored.get("pdf_url") or ""
+        if cached is not None:
+            return cached or None
+        pdf_url = self._probe_link_header(doi)
+        self._link_header_urls.set(doi, pdf_url or "")
+        # Only resolved links go to disk: a miss may be a transient HEAD failure.
+        if pdf_url and self._metadata_cache is not None:
+            self._metadata_cache.set("crossref-link", doi, {"pdf_url": pdf_url})
+        return pdf_url
+
+    def _probe_link_header(self, doi: str) -> Optional[str]:
+        url = self._DOI_RESOLVER_PREFIX + doi
         headers = {"Accept": self.UNIXSD_ACCEPT}
         LOGGER.debug("Crossref link header lookup %s", url)
         try:
-            self._throttle()
+            self._throttle(url)
             response = self._session.head(
                 url, headers=headers, timeout=30, allow_redirects=True
             )
@@ -657,16 +1010,35 @@ class CrossrefClient:
         if not link_header:
             return None
         parsed = parse_header_links(link_header.rstrip(">").replace(">,<", ">, <"))
-        pdf_links = [
-            entry.get("url")
-            for entry in parsed
-            if (entry.get("type") or "").lower() == "application/pdf"
-        ]
-        return pdf_links[0] if pdf_links else None
+        return next(
+            (
+                entry.get("url")
+                for entry in parsed
+                if (entry.get("type") or "").lower() == "application/pdf"
+            ),
+            None,
+        )
 
-    def _throttle(self) -> None:
+    def _throttle(self, url: str) -> None:
+        # ``request_delay`` sets the fastest pace for each host; hosts that advertise a
+        # smaller budget (api.crossref.org may) are slowed down from the response headers.
         if self._request_delay > 0:
-            time.sleep(self._request_delay)
+            host_bucket(urlsplit(url).netloc, rate=1.0 / self._request_delay).acquire()
+
+    def _retune_from_headers(self, url: str, response: requests.Response) -> None:
+        if self._request_delay <= 0:
+            return
+        limits = parse_rate_limit(response.headers)
+        if limits is None:
+            return
+        # The advertised limit is only an upper bound: it never overrides a stricter
+        # ``request_delay``, and one request per delay leaves no room for bursts.
+        rate = min(limits[0], 1.0 / self._request_delay)
+        host = urlsplit(url).netloc
+        bucket = host_bucket(host, rate=rate)
+        if bucket.rate != rate:
+            LOGGER.debug("Crossref rate limit for %s set to %.2f req/s", host, rate)
+            bucket.retune(rate, 1.0)
 
 
 class UnpaywallClient:
@@ -685,14 +1057,14 @@ class UnpaywallClient:
         session: Optional[requests.Session] = None,
         user_agent: str = DEFAULT_USER_AGENT,
     ) -> None:
-        email = email or os.getenv("UNPAYWALL_EMAIL")
+        email = email or _env_setting("UNPAYWALL_EMAIL")
         if not email:
             raise ValueError(
                 "UnpaywallClient requires a contact email. "
                 "Set UNPAYWALL_EMAIL or pass email= explicitly."
             )
         self._email = email
-        self._session = session or requests.Session()
+        self._session = session or build_session()
         self._session.headers.update(
             {
                 "User-Agent": user_agent,
@@ -719,10 +1091,12 @@ class UnpaywallClient:
         if not pdf_url:
             raise DownloadError(f"Unpaywall did not report an open-access PDF for DOI {doi}")
 
-        destination.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(destination.parent)
         LOGGER.debug("Unpaywall download: %s -> %s", pdf_url, destination)
         try:
-            response = self._session.get(pdf_url, timeout=120, stream=True)
+            response = self._session.get(
+                pdf_url, headers=resume_headers(destination, pdf_url), timeout=120, stream=True
+            )
         except requests.exceptions.TooManyRedirects:
             raise DownloadError(
                 f"Unpaywall download failed for DOI {doi}: URL redirected too many times (possibly broken link)"
@@ -731,15 +1105,12 @@ class UnpaywallClient:
             raise DownloadError(
                 f"Unpaywall download failed for DOI {doi}: {exc}"
             )
-        if response.status_code != requests.codes.ok:
+        if response.status_code not in RESUMABLE_STATUS_CODES:
             raise DownloadError(
                 f"Unpaywall download failed ({response.status_code}) for DOI {doi}"
             )
 
-        with destination.open("wb") as fout:
-            for chunk in response.iter_content(chunk_size=65536):
-                if chunk:
-                    fout.write(chunk)
+        stream_to_file(response, destination, resume_url=pdf_url)
         return destination
 
     def _fetch_record(self, doi: str) -> dict:
@@ -753,7 +1124,7 @@ class UnpaywallClient:
             raise DownloadError(
                 f"Unpaywall lookup failed ({response.status_code}) for DOI {doi}"
             )
-        return response.json() or {}
+        return _json_payload(response) or {}
 
     @staticmethod
     def _select_pdf_url(record: dict) -> Optional[str]:
@@ -781,6 +1152,9 @@ class OpenAlexClient:
     """
 
     BASE_URL = "https://api.openalex.org/works/"
+    WORKS_URL = "https://api.openalex.org/works"
+    # DOIs per ``/works?filter=doi:...`` request; OpenAlex accepts up to 100 OR-ed values.
+    BULK_LOOKUP_SIZE = 50
 
     def __init__(
         self,
@@ -788,15 +1162,18 @@ class OpenAlexClient:
         mailto: Optional[str] = None,
         session: Optional[requests.Session] = None,
         user_agent: str = DEFAULT_USER_AGENT,
+        metadata_cache: Optional[MetadataCache] = None,
     ) -> None:
-        mailto = mailto or os.getenv("OPENALEX_MAILTO")
+        mailto = mailto or _env_setting("OPENALEX_MAILTO")
         if not mailto:
             raise ValueError(
                 "OpenAlexClient requires a contact email. "
                 "Set OPENALEX_MAILTO or pass mailto= explicitly."
             )
         self._mailto = mailto
-        self._session = session or requests.Session()
+        self._session = session or build_session()
+        self._metadata_cache = metadata_cache
+        self._recent_metadata = QueryCache()
         ua_with_contact = f"{user_agent} (mailto:{self._mailto})"
         self._session.headers.update(
             {
@@ -826,11 +1203,14 @@ class OpenAlexClient:
         if not pdf_url:
             raise DownloadError(f"No open-access PDF URL available via OpenAlex for DOI {doi}")
 
-        destination.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(destination.parent)
         LOGGER.debug("OpenAlex download: %s -> %s", pdf_url, destination)
         try:
             response = self._session.get(
-                pdf_url, headers={"Accept": "application/pdf"}, timeout=120, stream=True
+                pdf_url,
+                headers=resume_headers(destination, pdf_url, {"Accept": "application/pdf"}),
+                timeout=120,
+                stream=True,
             )
         except requests.exceptions.TooManyRedirects:
             raise DownloadError(
@@ -840,18 +1220,77 @@ class OpenAlexClient:
             raise DownloadError(
                 f"OpenAlex download failed for DOI {doi}: {exc}"
             )
-        if response.status_code != requests.codes.ok:
+        if response.status_code not in RESUMABLE_STATUS_CODES:
             raise DownloadError(
                 f"OpenAlex download failed ({response.status_code}): {_response_preview(response)}"
             )
 
-        with destination.open("wb") as fout:
-            for chunk in response.iter_content(chunk_size=65536):
-                if chunk:
-                    fout.write(chunk)
+        stream_to_file(response, destination, resume_url=pdf_url)
         return destination
 
+    def prefetch_metadata(self, doi: str) -> None:
+        """
+        Look up ``doi`` ahead of :meth:`download_pdf` so the download can reuse the result.
+
+        Failures are only logged; :meth:`download_pdf` repeats the lookup and reports them.
+        """
+        try:
+            self._fetch_work(doi)
+        except (DownloadError, requests.exceptions.RequestException) as exc:
+            LOGGER.debug("OpenAlex metadata prefetch failed for %s: %s", doi, exc)
+
+    def prefetch_metadata_many(self, dois: Iterable[str]) -> None:
+        """
+        Look up many DOIs with one ``/works?filter=doi:...`` request per ``BULK_LOOKUP_SIZE``.
+
+        Results go to the same caches :meth:`download_pdf` reads, so those downloads skip
+        their own metadata request. DOIs the query does not return are left to the per-DOI
+        lookup; failures are only logged.
+        """
+        pending = [
+            doi for doi in dict.fromkeys(dois) if "|" not in doi and self._cached_work(doi) is None
+        ]
+        for start in range(0, len(pending), self.BULK_LOOKUP_SIZE):
+            chunk = {doi.lower(): doi for doi in pending[start : start + self.BULK_LOOKUP_SIZE]}
+            params = {
+                "filter": "doi:" + "|".join(chunk.values()),
+                "per-page": len(chunk),
+                "mailto": self._mailto,
+            }
+            LOGGER.debug("OpenAlex bulk metadata lookup for %d DOI(s)", len(chunk))
+            try:
+                response = self._session.get(self.WORKS_URL, params=params, timeout=60)
+                if response.status_code != requests.codes.ok:
+                    raise DownloadError(
+                        f"OpenAlex bulk metadata lookup failed ({response.status_code}): "
+                        f"{_response_preview(response)}"
+                    )
+                items = _json_payload(response).get("results") or []
+            except (DownloadError, requests.exceptions.RequestException, ValueError) as exc:
+                LOGGER.debug("OpenAlex bulk metadata prefetch failed: %s", exc)
+                continue
+            for work in items:
+                # Works carry their DOI as a lower-cased ``https://doi.org/...`` URL.
+                returned = str(work.get("doi") or "").lower().partition("doi.org/")[2]
+                doi = chunk.get(returned)
+                if doi is not None:
+                    self._remember_work(doi, work)
+
+    def _cached_work(self, doi: str) -> Optional[dict]:
+        cached = self._recent_metadata.get(doi)
+        if cached is None and self._metadata_cache is not None:
+            cached = self._metadata_cache.get("openalex", doi)
+        return cached
+
+    def _remember_work(self, doi: str, work: dict) -> None:
+        self._recent_metadata.set(doi, work)
+        if self._metadata_cache is not None:
+            self._metadata_cache.set("openalex", doi, work)
+
     def _fetch_work(self, doi: str) -> dict:
+        cached = self._cached_work(doi)
+        if cached is not None:
+            return cached
         identifier = quote(f"https://doi.org/{doi}", safe=":/")
         url = f"{self.BASE_URL}{identifier}"
         params = {"mailto": self._mailto}
@@ -861,7 +1300,9 @@ class OpenAlexClient:
             raise DownloadError(
                 f"OpenAlex metadata lookup failed ({response.status_code}): {_response_preview(response)}"
             )
-        return response.json()
+        work = _json_payload(response)
+        self._remember_work(doi, work)
+        return work
 
     @staticmethod
     def _is_open_access(work: dict) -> bool:
@@ -870,20 +1311,18 @@ class OpenAlexClient:
 
     @staticmethod
     def _extract_pdf_url(work: dict) -> Optional[str]:
-        candidates: list[str] = []
-
-        def add_location(loc: Optional[dict]) -> None:
-            if not isinstance(loc, dict):
-                return
-            pdf_url = loc.get("pdf_url") or loc.get("url_for_pdf")
+        # The best OA location wins; otherwise the first location that links a PDF.
+        best = work.get("best_oa_location")
+        if isinstance(best, dict):
+            pdf_url = best.get("pdf_url") or best.get("url_for_pdf")
             if pdf_url:
-                candidates.append(pdf_url)
-
-        add_location(work.get("best_oa_location"))
-        for loc in work.get("locations", []):
-            add_location(loc)
-
-        return candidates[0] if candidates else None
+                return pdf_url
+        for loc in work.get("locations") or ():
+            if isinstance(loc, dict):
+                pdf_url = loc.get("pdf_url") or loc.get("url_for_pdf")
+                if pdf_url:
+                    return pdf_url
+        return None
 
 
 class ElsevierClient:
@@ -901,6 +1340,11 @@ class ElsevierClient:
 
     SEARCH_URL = "https://api.elsevier.com/content/search/sciencedirect"
     ARTICLE_URL_TEMPLATE = "https://api.elsevier.com/content/article/{identifier_type}/{identifier}"
+    _ARTICLE_URL_PREFIXES: ClassVar[dict[str, str]] = {
+        "doi": ARTICLE_URL_TEMPLATE.format(identifier_type="doi", identifier=""),
+        "pii": ARTICLE_URL_TEMPLATE.format(identifier_type="pii", identifier=""),
+    }
+    _PDF_PARAMS: ClassVar[dict[str, str]] = {"httpAccept": "application/pdf"}
 
     def __init__(
         self,
@@ -910,20 +1354,22 @@ class ElsevierClient:
         authtoken: Optional[str] = None,
         session: Optional[requests.Session] = None,
         user_agent: str = DEFAULT_USER_AGENT,
+        search_cache: Optional[QueryCache] = None,
     ) -> None:
-        api_key = api_key or os.getenv("ELSEVIER_API_KEY")
+        api_key = api_key or _env_setting("ELSEVIER_API_KEY")
         if not api_key:
             raise ValueError(
                 "ElsevierClient requires an API key. "
                 "Set ELSEVIER_API_KEY or pass api_key= explicitly."
             )
-        insttoken = insttoken or os.getenv("ELSEVIER_INSTTOKEN")
-        authtoken = authtoken or os.getenv("ELSEVIER_AUTHTOKEN")
+        insttoken = insttoken or _env_setting("ELSEVIER_INSTTOKEN")
+        authtoken = authtoken or _env_setting("ELSEVIER_AUTHTOKEN")
 
         self._api_key = api_key
         self._insttoken = insttoken
         self._authtoken = authtoken
-        self._session = session or requests.Session()
+        self._session = session or build_session()
+        self._search_cache = search_cache or QueryCache()
         headers = {
             "X-ELS-APIKey": api_key,
             "Accept": "application/json",
@@ -967,6 +1413,12 @@ class ElsevierClient:
         """
         params: dict[str, str] = {"query": query, "count": str(count)}
         params["cursor"] = cursor or "*"
+        cache_key = (query, count, params["cursor"])
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            LOGGER.debug("Elsevier search cache hit: %s", cache_key)
+            cached_records, cached_cursor = cached
+            return list(cached_records), cached_cursor
 
         LOGGER.debug("Elsevier search params=%s", params)
         response = self._session.get(self.SEARCH_URL, params=params, timeout=60)
@@ -975,32 +1427,66 @@ class ElsevierClient:
                 f"Elsevier search failed ({response.status_code}): {_response_preview(response)}"
             )
 
-        payload = response.json()
+        payload = _json_payload(response)
         entries = (
             payload.get("search-results", {})
             .get("entry", [])
         )
-        records: list[ArticleRecord] = []
-        for entry in entries:
-            identifiers = entry.get("prism:doi"), entry.get("pii", entry.get("dc:identifier"))
-            doi = identifiers[0]
-            pii = identifiers[1]
-            pmid = entry.get("pubmed-id")
-            url = entry.get("link", [{}])[0].get("@href")
-            records.append(
-                ArticleRecord(
-                    title=entry.get("dc:title", ""),
-                    doi=doi,
-                    pii=pii,
-                    pmid=pmid,
-                    url=url,
-                    publisher="Elsevier",
-                )
+        records = [
+            ArticleRecord(
+                title=entry.get("dc:title", ""),
+                doi=entry.get("prism:doi"),
+                pii=entry["pii"] if "pii" in entry else entry.get("dc:identifier"),
+                pmid=entry.get("pubmed-id"),
+                url=(entry.get("link") or _EMPTY_LINKS)[0].get("@href"),
+                publisher="Elsevier",
             )
+            for entry in entries
+        ]
 
         next_cursor = payload.get("search-results", {}).get("cursor", {}).get("@next")
+        self._search_cache.set(cache_key, (tuple(records), next_cursor))
         return records, next_cursor
 
+    def iter_search(
+        self,
+        *,
+        query: str,
+        count: int = 25,
+        max_records: Optional[int] = None,
+    ) -> Iterator[ArticleRecord]:
+        """
+        Yield every record matching ``query``, following the ``next`` cursor page by page.
+
+        While the records of one page are being consumed, the next page is fetched on a
+        background thread, so callers such as :func:`batched_download` rarely wait on the
+        search API between pages.
+        """
+        cursor: Optional[str] = None
+        yielded = 0
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="elsevier-prefetch") as prefetch:
+            pending = prefetch.submit(self.search, query=query, count=count, cursor=cursor)
+            while True:
+                records, next_cursor = pending.result()
+                # Elsevier keeps returning a cursor on the last page; an empty page or a
+                # repeated cursor marks the end of the result set.
+                has_more = bool(records) and bool(next_cursor) and next_cursor != cursor
+                if has_more and (max_records is None or yielded + len(records) < max_records):
+                    pending = prefetch.submit(
+                        self.search, query=query, count=count, cursor=next_cursor
+                    )
+                else:
+                    has_more = False
+                for record in records:
+                    if max_records is not None and yielded >= max_records:
+                        return
+                    yield record
+                    yielded += 1
+                if not has_more:
+                    return
+                cursor = next_cursor
+
+    @_with_retry()
     def download_pdf(
         self,
         *,
@@ -1026,13 +1512,11 @@ class ElsevierClient:
             LOGGER.info("Skipping existing file: %s", destination)
             return destination
 
-        destination.parent.mkdir(parents=True, exist_ok=True)
+        _ensure_dir(destination.parent)
         identifier_type = "doi" if doi else "pii"
         identifier = doi if doi else pii
-        url = self.ARTICLE_URL_TEMPLATE.format(
-            identifier_type=identifier_type, identifier=identifier
-        )
-        params = {"httpAccept": "application/pdf"}
+        url = self._ARTICLE_URL_PREFIXES[identifier_type] + identifier
+        params = self._PDF_PARAMS
         LOGGER.info(
             "Elsevier PDF request: %s=%s destination=%s overwrite=%s auth[insttoken=%s authtoken=%s]",
             identifier_type,
@@ -1048,7 +1532,13 @@ class ElsevierClient:
             params,
         )
         try:
-            response = self._session.get(url, params=params, timeout=120, stream=True)
+            response = self._session.get(
+                url,
+                params=params,
+                headers=resume_headers(destination, url),
+                timeout=120,
+                stream=True,
+            )
         except requests.exceptions.TooManyRedirects:
             raise DownloadError(
                 f"Elsevier download failed for {identifier_type} {identifier}: URL redirected too many times"
@@ -1064,21 +1554,13 @@ class ElsevierClient:
             response.url,
             response_headers,
         )
-        if response.status_code != requests.codes.ok:
+        if response.status_code not in RESUMABLE_STATUS_CODES:
             raise DownloadError(
                 "Elsevier download failed "
                 f"({response.status_code}) headers={response_headers}: {_response_preview(response)}"
             )
 
-        total_bytes = 0
-        signature = b""
-        with destination.open("wb") as fout:
-            for chunk in response.iter_content(chunk_size=65536):
-                if chunk:
-                    if not signature:
-                        signature = chunk[:8]
-                    total_bytes += len(chunk)
-                    fout.write(chunk)
+        total_bytes, signature = stream_to_file(response, destination, resume_url=url)
         LOGGER.info(
             "Elsevier PDF saved: path=%s bytes=%d pdf_signature=%s",
             destination,
@@ -1088,6 +1570,372 @@ class ElsevierClient:
         return destination
 
 
+def _log_record_failure(record: ArticleRecord, exc: BaseException) -> None:
+    if isinstance(exc, DownloadError):
+        LOGGER.warning(
+            "Skipping %s (%s)：%s",
+            record.doi or record.title,
+            record.publisher,
+            exc,
+        )
+        return
+    LOGGER.error("Failed to download %s (%s)", record.title, record.publisher, exc_info=exc)
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
+class _PublisherRoute:
+    """How :func:`_download_record` handles the records of one routing key."""
+
+    label: str
+    # Names of the ``_download_record`` client arguments to try, in order.
+    clients: tuple[str, ...]
+    # The value the article directory is named after; records without one are rejected.
+    identifier: Callable[[ArticleRecord], Optional[str]]
+    # Elsevier can resolve articles by PII when there is no DOI.
+    pass_pii: bool = False
+    # Springer refuses subscription-only PDFs; those records are skipped, not failed.
+    skip_paywalled: bool = False
+    # Client errors that move on to the next provider; anything else propagates as a bug.
+    fallback_errors: tuple[type[Exception], ...] = (DownloadError,)
+
+
+# Routing keys, matched in this order as case-insensitive substrings of ``ArticleRecord.publisher``.
+_PUBLISHER_ROUTES: dict[str, _PublisherRoute] = {
+    "elsevier": _PublisherRoute(
+        "Elsevier", ("elsevier",), lambda record: record.doi or record.pii, pass_pii=True
+    ),
+    "wiley": _PublisherRoute("Wiley", ("wiley",), lambda record: record.doi),
+    "springer": _PublisherRoute(
+        "Springer", ("springer",), lambda record: record.doi, skip_paywalled=True
+    ),
+    # OpenAlex and Crossref resolve third-party links, so any failure falls through.
+    "crossref": _PublisherRoute(
+        "Crossref",
+        ("openalex", "crossref"),
+        lambda record: record.doi,
+        fallback_errors=(Exception,),
+    ),
+}
+_PUBLISHER_KEYS = tuple(_PUBLISHER_ROUTES)
+_CLIENT_LABELS = {
+    "elsevier": "Elsevier",
+    "wiley": "Wiley",
+    "springer": "Springer",
+    "openalex": "OpenAlex",
+    "crossref": "Crossref",
+}
+
+
+@lru_cache(maxsize=256)
+def _publisher_key(publisher: Optional[str]) -> Optional[str]:
+    """
+    Map a record's publisher name to its routing key, or ``None`` when no client handles it.
+
+    Cached because a batch only carries a handful of distinct publisher names.
+    """
+    lowered = (publisher or "").lower()
+    return next((key for key in _PUBLISHER_KEYS if key in lowered), None)
+
+
+def _existing_pdf(
+    record: ArticleRecord,
+    output_root: Path,
+    existing_dirs: Optional[AbstractSet[str]] = None,
+) -> Optional[Path]:
+    """
+    Return the PDF already saved for ``record`` under ``output_root``, if there is one.
+    """
+    route = _PUBLISHER_ROUTES.get(_publisher_key(record.publisher))
+    identifier = route.identifier(record) if route is not None else None
+    if not identifier:
+        return None
+    fname = _safe_identifier(identifier)
+    if existing_dirs is not None and fname not in existing_dirs:
+        return None
+    pdf_path = _article_destination(output_root / fname, fname)
+    return pdf_path if pdf_path.exists() else None
+
+
+def _prefetch_record_metadata(
+    record: ArticleRecord,
+    *,
+    output_root: Path,
+    crossref_client: Optional[CrossrefClient],
+    openalex_client: Optional[OpenAlexClient],
+    springer_client: Optional[SpringerClient],
+    overwrite: bool,
+    existing_dirs: Optional[AbstractSet[str]] = None,
+) -> None:
+    """
+    Warm the metadata lookup that ``record``'s first download attempt will make.
+
+    Springer, OpenAlex and Crossref fetch metadata before the PDF; doing that ahead of time
+    keeps the lookup out of the per-publisher download slot. Records whose PDF is already
+    on disk are left alone.
+    """
+    if not record.doi:
+        return
+    if not overwrite and _existing_pdf(record, output_root, existing_dirs) is not None:
+        return
+    publisher = _publisher_key(record.publisher)
+    if publisher == "springer" and springer_client:
+        springer_client.prefetch_metadata(record.doi)
+    elif publisher == "crossref":
+        # OpenAlex is tried first; Crossref's metadata is only needed when it fails.
+        client = openalex_client or crossref_client
+        if client:
+            client.prefetch_metadata(record.doi)
+
+
+def _prefetch_batch_metadata(
+    records: Sequence[ArticleRecord],
+    *,
+    output_root: Path,
+    crossref_client: Optional[CrossrefClient],
+    openalex_client: Optional[OpenAlexClient],
+    overwrite: bool,
+    existing_dirs: Optional[AbstractSet[str]] = None,
+) -> None:
+    """
+    Resolve the metadata of every Crossref-routed record with bulk ``/works`` queries.
+
+    Uses the provider each record tries first (OpenAlex, else Crossref), so a batch of N
+    such DOIs costs about N / ``BULK_LOOKUP_SIZE`` metadata requests instead of N. Records
+    whose PDF is already on disk are skipped; pass the batch's ``existing_dirs`` (from
+    :func:`_batch_article_dirs`) so the output root is not listed a second time.
+    """
+    client = openalex_client or crossref_client
+    if client is None:
+        return
+    dois = [
+        record.doi
+        for record in records
+        if record.doi
+        and _publisher_key(record.publisher) == "crossref"
+        and (overwrite or _existing_pdf(record, output_root, existing_dirs) is None)
+    ]
+    if dois:
+        client.prefetch_metadata_many(dois)
+
+
+@lru_cache(maxsize=None)
+def _publisher_pacer(delay_seconds: Optional[float]) -> Optional[KeyedBuckets]:
+    """
+    Per-publisher pacing: each publisher starts at most one record every ``delay_seconds``.
+
+    Replaces a sleep after every download, which held all publishers to one shared pace.
+    Cached so callers that download one DOI per call (the multi-DOI script) stay paced
+    across calls.
+    """
+    if not delay_seconds or delay_seconds <= 0:
+        return None
+    return KeyedBuckets(1.0 / delay_seconds)
+
+
+def _attempt_unpaywall_download(
+    unpaywall_client: Optional[UnpaywallClient],
+    doi: Optional[str],
+    destination: Path,
+    *,
+    overwrite: bool,
+) -> Optional[Path]:
+    if not unpaywall_client or not doi:
+        return None
+    try:
+        return unpaywall_client.download_pdf(
+            doi=doi,
+            destination=destination,
+            overwrite=overwrite,
+        )
+    except DownloadError as exc:
+        LOGGER.debug("Unpaywall fallback failed for %s: %s", doi, exc)
+        return None
+
+
+def _looks_paywalled(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return "metadata not found" in message or "download failed (403" in message
+
+
+def _download_supplements(
+    record: ArticleRecord,
+    pdf_path: Path,
+    *,
+    supplement_session: requests.Session,
+    overwrite: bool,
+) -> list[Path]:
+    if not record.doi:
+        return []
+    return download_supplements_for_doi(
+        doi=record.doi,
+        destination_dir=pdf_path.parent,
+        session=supplement_session,
+        overwrite=overwrite,
+        publisher=record.publisher,
+    )
+
+
+def _add_supplements(
+    record: ArticleRecord,
+    drained: tuple[list[Path], Optional[str], Optional[Exception]],
+    *,
+    supplement_session: requests.Session,
+    overwrite: bool,
+) -> tuple[list[Path], Optional[str], Optional[Exception]]:
+    """
+    Finish a record drained from ``_download_record(..., include_supplements=False)``.
+
+    The concurrent batch variants call this after giving up the record's publisher slot:
+    supplements are scraped from the DOI landing page rather than the publisher API, so the
+    next record's PDF can start while this one's supplementary files are still downloading.
+    """
+    paths, outcome, error = drained
+    if outcome != "downloaded" or not paths:
+        return drained
+    try:
+        paths.extend(
+            _download_supplements(
+                record, paths[0], supplement_session=supplement_session, overwrite=overwrite
+            )
+        )
+    except Exception as exc:  # noqa: BLE001
+        return paths, None, exc
+    return paths, outcome, error
+
+
+def _download_record(
+    record: ArticleRecord,
+    *,
+    output_root: Path,
+    elsevier_client: Optional[ElsevierClient],
+    crossref_client: Optional[CrossrefClient],
+    openalex_client: Optional[OpenAlexClient],
+    unpaywall_client: Optional[UnpaywallClient],
+    springer_client: Optional[SpringerClient],
+    wiley_client: Optional[WileyClient],
+    supplement_session: requests.Session,
+    overwrite: bool,
+    existing_dirs: Optional[AbstractSet[str]] = None,
+    pacer: Optional[KeyedBuckets] = None,
+    include_supplements: bool = True,
+) -> Generator[Path, None, str]:
+    """
+    Route one record to its publisher client, yielding the PDF and any supplements it saves.
+
+    Returns ``"existing"`` when the PDF was already on disk, ``"skipped"`` when a
+    subscription-only Springer article was passed over, and ``"downloaded"`` otherwise.
+    Errors propagate once an empty article directory has been removed. ``existing_dirs``
+    (from :func:`_scan_article_dirs`) lets records without an article directory skip the
+    on-disk check for an existing PDF. ``pacer`` (see :func:`_publisher_pacer`) is waited on
+    before anything is requested, so records already on disk never spend a token.
+    A record whose article is already being fetched by another thread waits for it (see
+    :func:`_single_flight`) and reuses the saved PDF instead of requesting it again.
+    With ``include_supplements=False`` the generator stops after the PDF; the caller then
+    runs :func:`_add_supplements` itself.
+    """
+    publisher = _publisher_key(record.publisher)
+    route = _PUBLISHER_ROUTES.get(publisher)
+    clients = {
+        "elsevier": elsevier_client,
+        "wiley": wiley_client,
+        "springer": springer_client,
+        "openalex": openalex_client,
+        "crossref": crossref_client,
+    }
+    article_dir: Optional[Path] = None
+
+    # Early check: if PDF already exists and overwrite is False, skip everything
+    if not overwrite:
+        existing = _existing_pdf(record, output_root, existing_dirs)
+        if existing is not None:
+            LOGGER.info("跳过已存在的文章（PDF和SI均跳过）: %s", record.doi or record.pii)
+            yield existing
+            return "existing"
+
+    try:
+        if route is None:
+            raise DownloadError(
+                f"Unsupported publisher for record {record.publisher}: {record.title}"
+            )
+        identifier = route.identifier(record)
+        if not identifier:
+            needed = "DOI/PII" if route.pass_pii else "DOI"
+            raise DownloadError(f"No {needed} for {route.label} record: {record}")
+        fname = _safe_identifier(identifier)
+        article_dir = output_root / fname
+        destination = _article_destination(article_dir, fname)
+        extra = {"pii": record.pii} if route.pass_pii else {}
+
+        pdf_path: Optional[Path] = None
+        with _single_flight(article_dir) as waited:
+            # Whoever held the slot saved this PDF (and its supplements) just now.
+            reused = waited and destination.exists()
+            if not reused:
+                if pacer is not None:
+                    pacer.acquire(publisher)
+                # Each client's failure is kept with its name, so the final error reports
+                # all of them rather than only the last one.
+                tried: list[tuple[str, Exception]] = []
+                for name in route.clients:
+                    client = clients[name]
+                    if client is None:
+                        continue
+                    try:
+                        pdf_path = client.download_pdf(
+                            doi=record.doi,
+                            destination=destination,
+                            overwrite=overwrite,
+                            **extra,
+                        )
+                        break
+                    except route.fallback_errors as exc:  # noqa: BLE001
+                        LOGGER.debug(
+                            "%sClient failed for %s (%s)", _CLIENT_LABELS[name], identifier, exc
+                        )
+                        tried.append((_CLIENT_LABELS[name], exc))
+                else:
+                    pdf_path = _attempt_unpaywall_download(
+                        unpaywall_client, record.doi, destination, overwrite=overwrite
+                    )
+                    if pdf_path is None:
+                        if not tried:
+                            names = " or ".join(
+                                f"{_CLIENT_LABELS[name]}Client" for name in route.clients
+                            )
+                            raise DownloadError(
+                                f"No {names} configured for {route.label} record."
+                            )
+                        last_error = tried[-1][1]
+                        if route.skip_paywalled and _looks_paywalled(last_error):
+                            LOGGER.info(
+                                "%s DOI %s 跳过：需订阅访问，手动登录后再获取 PDF。",
+                                route.label,
+                                record.doi,
+                            )
+                            _cleanup_article_dir(article_dir)
+                            return "skipped"
+                        if len(tried) == 1:
+                            raise last_error
+                        summary = "; ".join(f"{name}: {exc}" for name, exc in tried)
+                        raise DownloadError(
+                            f"All providers failed for {identifier}: {summary}"
+                        ) from last_error
+        if reused:
+            LOGGER.info("Reusing %s, saved by a concurrent download of the same article", destination)
+            yield destination
+            return "existing"
+        yield pdf_path
+        if include_supplements:
+            yield from _download_supplements(
+                record, pdf_path, supplement_session=supplement_session, overwrite=overwrite
+            )
+    except Exception:  # noqa: BLE001
+        if article_dir:
+            _cleanup_article_dir(article_dir)
+        raise
+    return "downloaded"
+
+
 def batched_download(
     *,
     records: Iterable[ArticleRecord],
@@ -1102,240 +1950,371 @@ def batched_download(
     delay_seconds: Optional[float] = None,
     raise_on_error: bool = True,
     metrics: Optional[MutableMapping[str, dict[str, int]]] = None,
+    supplement_session: Optional[requests.Session] = None,
+    existing_dirs: Optional[AbstractSet[str]] = None,
 ) -> Iterator[Path]:
     """
     Download a batch of records, routing each entry to the appropriate publisher client.
+
+    ``supplement_session`` is used for SI discovery and downloads; pass one built on the
+    clients' shared adapter so those requests reuse the same connection pool.
+    ``delay_seconds`` paces each publisher separately: a record waits only when the previous
+    request to its own publisher started less than ``delay_seconds`` ago.
+    ``metrics`` receives per-publisher ``attempted``/``succeeded`` counts, updated as each
+    record starts and finishes, so it can be read while the batch is still running.
+    ``existing_dirs`` is a listing from :func:`_scan_article_dirs` to check instead of
+    listing ``output_root`` again; see :func:`_batch_article_dirs`.
     """
-    supplement_session = requests.Session()
+    supplement_session = supplement_session or build_session()
     supplement_session.headers.setdefault("User-Agent", DEFAULT_USER_AGENT)
+    # One directory listing up front instead of a stat (and mkdir) per record on reruns.
+    existing_dirs = _batch_article_dirs(
+        records, output_root, overwrite=overwrite, existing_dirs=existing_dirs
+    )
+    pacer = _publisher_pacer(delay_seconds)
 
-    def _attempt_unpaywall_download(
-        doi: str, destination: Path
-    ) -> Optional[Path]:
-        if not unpaywall_client or not doi:
-            return None
+    for record in records:
+        publisher_label = record.publisher or "Unknown"
+        _count_record(metrics, publisher_label, "attempted")
         try:
-            return unpaywall_client.download_pdf(
-                doi=doi,
-                destination=destination,
+            outcome = yield from _download_record(
+                record,
+                output_root=output_root,
+                elsevier_client=elsevier_client,
+                crossref_client=crossref_client,
+                openalex_client=openalex_client,
+                unpaywall_client=unpaywall_client,
+                springer_client=springer_client,
+                wiley_client=wiley_client,
+                supplement_session=supplement_session,
                 overwrite=overwrite,
+                existing_dirs=existing_dirs,
+                pacer=pacer,
             )
-        except DownloadError as exc:
-            LOGGER.debug("Unpaywall fallback failed for %s: %s", doi, exc)
-            return None
+        except Exception as exc:  # noqa: BLE001
+            _log_record_failure(record, exc)
+            if raise_on_error:
+                raise
+            continue
+        if outcome != "skipped":
+            _count_record(metrics, publisher_label, "succeeded")
 
-    for record in records:
-        publisher = (record.publisher or "").lower()
-        publisher_label = record.publisher or "Unknown"
-        metrics_entry: Optional[dict[str, int]] = None
-        if metrics is not None:
-            metrics_entry = metrics.setdefault(
-                publisher_label, {"attempted": 0, "succeeded": 0}
+
+def _count_record(
+    metrics: Optional[MutableMapping[str, dict[str, int]]], label: str, field: str
+) -> None:
+    """Add one to ``metrics[label][field]`` (``"attempted"`` or ``"succeeded"``), if tracked."""
+    if metrics is None:
+        return
+    entry = metrics.setdefault(label, {"attempted": 0, "succeeded": 0})
+    entry[field] += 1
+
+
+def _drain_record(
+    downloads: Generator[Path, None, str],
+) -> tuple[list[Path], Optional[str], Optional[Exception]]:
+    """
+    Run a :func:`_download_record` generator to completion on the calling thread.
+
+    Returns the saved paths, the outcome, and the exception that stopped it (if any).
+    """
+    paths: list[Path] = []
+    try:
+        while True:
+            paths.append(next(downloads))
+    except StopIteration as stop:
+        return paths, stop.value, None
+    except Exception as exc:  # noqa: BLE001
+        return paths, None, exc
+
+
+def _publisher_limit_key(
+    publisher: Optional[str], limits: Mapping[str, int]
+) -> Optional[str]:
+    key = _publisher_key(publisher)
+    return key if key in limits else None
+
+
+async def batched_download_async(
+    *,
+    records: Iterable[ArticleRecord],
+    output_root: Path,
+    elsevier_client: Optional[ElsevierClient] = None,
+    crossref_client: Optional[CrossrefClient] = None,
+    openalex_client: Optional[OpenAlexClient] = None,
+    unpaywall_client: Optional[UnpaywallClient] = None,
+    springer_client: Optional[SpringerClient] = None,
+    wiley_client: Optional[WileyClient] = None,
+    overwrite: bool = False,
+    delay_seconds: Optional[float] = None,
+    raise_on_error: bool = True,
+    metrics: Optional[MutableMapping[str, dict[str, int]]] = None,
+    supplement_session: Optional[requests.Session] = None,
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    publisher_concurrency: Optional[Mapping[str, int]] = None,
+    existing_dirs: Optional[AbstractSet[str]] = None,
+) -> AsyncIterator[Path]:
+    """
+    Asynchronous variant of :func:`batched_download` that keeps up to ``concurrency`` records in flight.
+
+    The publisher clients are blocking, so each record runs on a ``concurrency``-sized thread
+    pool owned by this call, rather than the loop's default executor that every
+    ``asyncio.to_thread`` caller in the process shares. That includes its directory setup
+    and file writes, so disk I/O never stalls the event loop. A record's paths are yielded
+    together as soon as it finishes, which means output follows completion order rather
+    than input order. If iteration stops early, records already running finish before the
+    generator closes.
+
+    ``publisher_concurrency`` caps the records in flight per publisher (defaults to
+    ``DEFAULT_PUBLISHER_CONCURRENCY``) so one publisher's rate limit is not hit by the whole
+    pool at once; 429/503 responses are retried with ``Retry-After`` by the pooled sessions.
+    ``existing_dirs`` works as in :func:`batched_download`.
+    """
+    supplement_session = supplement_session or build_session()
+    supplement_session.headers.setdefault("User-Agent", DEFAULT_USER_AGENT)
+    loop = asyncio.get_running_loop()
+    # Every blocking call below holds a global slot, so ``concurrency`` threads never queue.
+    pool = ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="paper-dl")
+
+    def _off_loop(func: Callable, *args) -> asyncio.Future:
+        return loop.run_in_executor(pool, partial(func, *args))
+
+    # One directory listing up front instead of a stat (and mkdir) per record on reruns.
+    # Like every other filesystem call here it runs off the event loop thread.
+    try:
+        existing_dirs = await _off_loop(
+            partial(
+                _batch_article_dirs,
+                records,
+                output_root,
+                overwrite=overwrite,
+                existing_dirs=existing_dirs,
             )
-            metrics_entry["attempted"] += 1
-        article_dir: Optional[Path] = None
-        pdf_downloaded = False
-        
-        # Early check: if PDF already exists and overwrite is False, skip everything
-        identifier = None
-        if "elsevier" in publisher:
-            identifier = record.doi or record.pii
-        elif "wiley" in publisher or "springer" in publisher or "crossref" in publisher:
-            identifier = record.doi
-        
-        if identifier and not overwrite:
-            fname = _safe_identifier(identifier)
-            article_dir_check = output_root / fname
-            pdf_path_check = _article_destination(article_dir_check, fname)
-            if pdf_path_check.exists():
-                LOGGER.info("跳过已存在的文章（PDF和SI均跳过）: %s", identifier)
-                yield pdf_path_check
-                if metrics_entry:
-                    metrics_entry["succeeded"] += 1
+        )
+    except BaseException:
+        pool.shutdown(wait=False)
+        raise
+    route = partial(
+        _download_record,
+        output_root=output_root,
+        elsevier_client=elsevier_client,
+        crossref_client=crossref_client,
+        openalex_client=openalex_client,
+        unpaywall_client=unpaywall_client,
+        springer_client=springer_client,
+        wiley_client=wiley_client,
+        supplement_session=supplement_session,
+        overwrite=overwrite,
+        existing_dirs=existing_dirs,
+        pacer=_publisher_pacer(delay_seconds),
+        include_supplements=False,
+    )
+    finish = partial(
+        _add_supplements, supplement_session=supplement_session, overwrite=overwrite
+    )
+    prefetch = partial(
+        _prefetch_record_metadata,
+        output_root=output_root,
+        crossref_client=crossref_client,
+        openalex_client=openalex_client,
+        springer_client=springer_client,
+        overwrite=overwrite,
+        existing_dirs=existing_dirs,
+    )
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    publisher_limits = dict(
+        DEFAULT_PUBLISHER_CONCURRENCY if publisher_concurrency is None else publisher_concurrency
+    )
+    publisher_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    async def _run_in_slot(
+        record: ArticleRecord,
+    ) -> tuple[list[Path], Optional[str], Optional[Exception]]:
+        async with semaphore:
+            return await _off_loop(_drain_record, route(record))
+
+    async def _process(
+        record: ArticleRecord,
+    ) -> tuple[ArticleRecord, list[Path], Optional[str], Optional[Exception]]:
+        # Metadata lookups only take a global slot, so they run ahead of saturated publishers.
+        async with semaphore:
+            await _off_loop(prefetch, record)
+        # Wait for the publisher slot first so a saturated publisher never holds global slots.
+        key = _publisher_limit_key(record.publisher, publisher_limits)
+        if key is None:
+            drained = await _run_in_slot(record)
+        else:
+            if key not in publisher_semaphores:
+                publisher_semaphores[key] = asyncio.Semaphore(max(publisher_limits[key], 1))
+            async with publisher_semaphores[key]:
+                drained = await _run_in_slot(record)
+        async with semaphore:
+            paths, outcome, error = await _off_loop(finish, record, drained)
+        return record, paths, outcome, error
+
+    tasks: list[asyncio.Task] = []
+    for record in records:
+        _count_record(metrics, record.publisher or "Unknown", "attempted")
+        tasks.append(asyncio.ensure_future(_process(record)))
+
+    try:
+        for finished in asyncio.as_completed(tasks):
+            record, paths, outcome, error = await finished
+            for path in paths:
+                yield path
+            if error is not None:
+                _log_record_failure(record, error)
+                if raise_on_error:
+                    raise error
                 continue
-        
+            if outcome != "skipped":
+                _count_record(metrics, record.publisher or "Unknown", "succeeded")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Queued records are dropped; wait for the ones already running so no file is still
+        # being written once the batch returns. The wait itself runs off the event loop.
+        await loop.run_in_executor(None, partial(pool.shutdown, wait=True, cancel_futures=True))
+
+
+def batched_download_threaded(
+    *,
+    records: Iterable[ArticleRecord],
+    output_root: Path,
+    elsevier_client: Optional[ElsevierClient] = None,
+    crossref_client: Optional[CrossrefClient] = None,
+    openalex_client: Optional[OpenAlexClient] = None,
+    unpaywall_client: Optional[UnpaywallClient] = None,
+    springer_client: Optional[SpringerClient] = None,
+    wiley_client: Optional[WileyClient] = None,
+    overwrite: bool = False,
+    delay_seconds: Optional[float] = None,
+    raise_on_error: bool = True,
+    metrics: Optional[MutableMapping[str, dict[str, int]]] = None,
+    supplement_session: Optional[requests.Session] = None,
+    max_workers: int = DEFAULT_BATCH_CONCURRENCY,
+    publisher_concurrency: Optional[Mapping[str, int]] = None,
+    existing_dirs: Optional[AbstractSet[str]] = None,
+) -> Iterator[Path]:
+    """
+    Thread-pool variant of :func:`batched_download` for callers that cannot run an event loop.
+
+    Up to ``max_workers`` records download at once, capped per publisher by
+    ``publisher_concurrency`` as in :func:`batched_download_async`; records waiting for a
+    publisher slot do not occupy a worker. Paths are yielded per record in completion
+    order. If iteration stops early, records already running finish before this returns.
+    In both concurrent variants, Springer/OpenAlex/Crossref
+    metadata is looked up before a record waits for its publisher slot, and supplementary
+    files are fetched after the slot is released.
+    """
+    supplement_session = supplement_session or build_session()
+    supplement_session.headers.setdefault("User-Agent", DEFAULT_USER_AGENT)
+    existing_dirs = _batch_article_dirs(
+        records, output_root, overwrite=overwrite, existing_dirs=existing_dirs
+    )
+    route = partial(
+        _download_record,
+        output_root=output_root,
+        elsevier_client=elsevier_client,
+        crossref_client=crossref_client,
+        openalex_client=openalex_client,
+        unpaywall_client=unpaywall_client,
+        springer_client=springer_client,
+        wiley_client=wiley_client,
+        supplement_session=supplement_session,
+        overwrite=overwrite,
+        existing_dirs=existing_dirs,
+        pacer=_publisher_pacer(delay_seconds),
+        include_supplements=False,
+    )
+    finish = partial(
+        _add_supplements, supplement_session=supplement_session, overwrite=overwrite
+    )
+    prefetch = partial(
+        _prefetch_record_metadata,
+        output_root=output_root,
+        crossref_client=crossref_client,
+        openalex_client=openalex_client,
+        springer_client=springer_client,
+        overwrite=overwrite,
+        existing_dirs=existing_dirs,
+    )
+    publisher_limits = dict(
+        DEFAULT_PUBLISHER_CONCURRENCY if publisher_concurrency is None else publisher_concurrency
+    )
+    # Free download slots per publisher, and the records waiting for one. A record only
+    # reaches a worker once it holds its publisher's slot, so a saturated publisher parks
+    # its records here instead of blocking pool threads that other publishers could use.
+    free_slots = {name: max(limit, 1) for name, limit in publisher_limits.items()}
+    waiting: dict[str, deque[ArticleRecord]] = {name: deque() for name in publisher_limits}
+    slot_lock = threading.Lock()
+    stopped = False
+    done: queue.SimpleQueue = queue.SimpleQueue()
+
+    def _start(record: ArticleRecord) -> None:
         try:
-            if "elsevier" in publisher:
-                if not elsevier_client:
-                    raise DownloadError("ElsevierClient missing for Elsevier record.")
-                identifier = record.doi or record.pii
-                if not identifier:
-                    raise DownloadError(f"No DOI/PII for Elsevier record: {record}")
-                fname = _safe_identifier(identifier)
-                article_dir = output_root / fname
-                pdf_path = _article_destination(article_dir, fname)
-                try:
-                    pdf_path = elsevier_client.download_pdf(
-                        doi=record.doi,
-                        pii=record.pii,
-                        destination=pdf_path,
-                        overwrite=overwrite,
-                    )
-                except DownloadError:
-                    fallback = _attempt_unpaywall_download(record.doi or "", pdf_path)
-                    if fallback is None:
-                        raise
-                    pdf_path = fallback
-                pdf_downloaded = True
-                yield pdf_path
-                if record.doi:
-                    for supplemental in download_supplements_for_doi(
-                        doi=record.doi,
-                        destination_dir=article_dir,
-                        session=supplement_session,
-                        overwrite=overwrite,
-                        publisher=record.publisher,
-                    ):
-                        yield supplemental
-            elif "wiley" in publisher:
-                if not wiley_client:
-                    raise DownloadError("WileyClient missing for Wiley record.")
-                if not record.doi:
-                    raise DownloadError(f"No DOI for Wiley record: {record}")
-                fname = _safe_identifier(record.doi)
-                article_dir = output_root / fname
-                pdf_path = _article_destination(article_dir, fname)
-                try:
-                    pdf_path = wiley_client.download_pdf(
-                        doi=record.doi,
-                        destination=pdf_path,
-                        overwrite=overwrite,
-                    )
-                except DownloadError:
-                    fallback = _attempt_unpaywall_download(record.doi, pdf_path)
-                    if fallback is None:
-                        raise
-                    pdf_path = fallback
-                pdf_downloaded = True
-                yield pdf_path
-                for supplemental in download_supplements_for_doi(
-                    doi=record.doi,
-                    destination_dir=article_dir,
-                    session=supplement_session,
-                    overwrite=overwrite,
-                    publisher=record.publisher,
-                ):
-                    yield supplemental
-            elif "springer" in publisher:
-                if not springer_client:
-                    raise DownloadError("SpringerClient missing for Springer record.")
-                if not record.doi:
-                    raise DownloadError(f"No DOI for Springer record: {record}")
-                fname = _safe_identifier(record.doi)
-                article_dir = output_root / fname
-                pdf_path = _article_destination(article_dir, fname)
-                try:
-                    pdf_path = springer_client.download_pdf(
-                        doi=record.doi,
-                        destination=pdf_path,
-                        overwrite=overwrite,
-                    )
-                except DownloadError as exc:
-                    fallback = _attempt_unpaywall_download(record.doi, pdf_path)
-                    if fallback is None:
-                        message = str(exc).lower()
-                        if "metadata not found" in message or "download failed (403" in message:
-                            LOGGER.info(
-                                "Springer DOI %s 跳过：需订阅访问，手动登录后再获取 PDF。", record.doi
-                            )
-                            _cleanup_article_dir(article_dir)
-                            continue
-                        raise
-                    pdf_path = fallback
-                pdf_downloaded = True
-                yield pdf_path
-                for supplemental in download_supplements_for_doi(
-                    doi=record.doi,
-                    destination_dir=article_dir,
-                    session=supplement_session,
-                    overwrite=overwrite,
-                    publisher=record.publisher,
-                ):
-                    yield supplemental
-            elif "crossref" in publisher:
-                if not record.doi:
-                    raise DownloadError(f"No DOI for Crossref record: {record}")
-                fname = _safe_identifier(record.doi)
-                article_dir = output_root / fname
-                destination = _article_destination(article_dir, fname)
-                tried: list[Exception] = []
-                success = False
-                pdf_path: Optional[Path] = None
-                if openalex_client:
-                    try:
-                        pdf_path = openalex_client.download_pdf(
-                            doi=record.doi,
-                            destination=destination,
-                            overwrite=overwrite,
-                        )
-                        success = True
-                    except Exception as exc:  # noqa: BLE001
-                        LOGGER.debug(
-                            "OpenAlexClient failed for %s (%s); falling back to Crossref if possible",
-                            record.doi,
-                            exc,
-                        )
-                        tried.append(exc)
-                if not success and crossref_client:
-                    try:
-                        pdf_path = crossref_client.download_pdf(
-                            doi=record.doi,
-                            destination=destination,
-                            overwrite=overwrite,
-                        )
-                        success = True
-                    except Exception as exc:  # noqa: BLE001
-                        LOGGER.debug(
-                            "CrossrefClient failed for %s (%s)",
-                            record.doi,
-                            exc,
-                        )
-                        tried.append(exc)
-                if not success:
-                    fallback = _attempt_unpaywall_download(record.doi, destination)
-                    if fallback is not None:
-                        pdf_path = fallback
-                        success = True
-                if not success:
-                    if tried:
-                        raise tried[-1]
-                    raise DownloadError(
-                        "Neither OpenAlexClient nor CrossrefClient configured for Crossref record."
-                    )
-                if not pdf_path:
-                    raise DownloadError(f"Unable to resolve PDF for Crossref DOI {record.doi}")
-                pdf_downloaded = True
-                yield pdf_path
-                for supplemental in download_supplements_for_doi(
-                    doi=record.doi,
-                    destination_dir=article_dir,
-                    session=supplement_session,
-                    overwrite=overwrite,
-                    publisher=record.publisher,
-                ):
-                    yield supplemental
+            # The metadata lookup happens before taking the publisher slot, so the slot is
+            # only held while the PDF itself streams.
+            prefetch(record)
+            key = _publisher_limit_key(record.publisher, publisher_limits)
+            if key is not None:
+                with slot_lock:
+                    if not free_slots[key]:
+                        waiting[key].append(record)
+                        return
+                    free_slots[key] -= 1
+        except BaseException as exc:
+            done.put(exc)
+            raise
+        _download(record, key)
+
+    def _download(record: ArticleRecord, key: Optional[str]) -> None:
+        try:
+            try:
+                drained = _drain_record(route(record))
+            finally:
+                if key is not None:
+                    _release(key)
+            paths, outcome, error = finish(record, drained)
+        except BaseException as exc:
+            done.put(exc)
+            raise
+        done.put((record, paths, outcome, error))
+
+    def _release(key: str) -> None:
+        # Hand the slot straight to the next waiting record, if any.
+        with slot_lock:
+            if waiting[key] and not stopped:
+                executor.submit(_download, waiting[key].popleft(), key)
             else:
-                raise DownloadError(
-                    f"Unsupported publisher for record {record.publisher}: {record.title}"
-                )
-            if metrics_entry and pdf_downloaded:
-                metrics_entry["succeeded"] += 1
-            if delay_seconds:
-                time.sleep(delay_seconds)
-        except Exception as exc:  # noqa: BLE001
-            if article_dir:
-                _cleanup_article_dir(article_dir)
-            if isinstance(exc, DownloadError):
-                LOGGER.warning(
-                    "Skipping %s (%s)：%s",
-                    record.doi or record.title,
-                    record.publisher,
-                    exc,
-                )
+                free_slots[key] += 1
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(max_workers, 1), thread_name_prefix="batched-download"
+    )
+    try:
+        submitted = 0
+        for record in records:
+            _count_record(metrics, record.publisher or "Unknown", "attempted")
+            executor.submit(_start, record)
+            submitted += 1
+
+        for _ in range(submitted):
+            item = done.get()
+            if isinstance(item, BaseException):
+                raise item
+            record, paths, outcome, error = item
+            yield from paths
+            if error is not None:
+                _log_record_failure(record, error)
                 if raise_on_error:
-                    raise
+                    raise error
                 continue
-            LOGGER.exception("Failed to download %s (%s)", record.title, record.publisher)
-            if raise_on_error:
-                raise
-            continue
+            if outcome != "skipped":
+                _count_record(metrics, record.publisher or "Unknown", "succeeded")
+    finally:
+        # Drop queued and parked records, then wait for the ones already running.
+        with slot_lock:
+            stopped = True
+        executor.shutdown(wait=True, cancel_futures=True)
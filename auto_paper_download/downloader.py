@@ -4,12 +4,16 @@ Core helpers for extracting DOIs from Web of Science exports and downloading PDF
 
 from __future__ import annotations
 
+import json
 import logging
+import mmap
 import os
 import re
 from collections import Counter
 from pathlib import Path
-from typing import Iterable, Iterator, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from requests.adapters import HTTPAdapter
 
 from .clients import (
     ArticleRecord,
@@ -20,20 +24,47 @@ from .clients import (
     UnpaywallClient,
     SpringerClient,
     WileyClient,
+    _batch_article_dirs,
+    _env_setting,
+    _prefetch_batch_metadata,
     batched_download,
+    batched_download_threaded,
 )
+from .cache import METADATA_CACHE_FILENAME, MetadataCache
+from .sessions import DEFAULT_POOL_MAXSIZE, build_http_adapter, build_session
 
 LOGGER = logging.getLogger(__name__)
 
 DOI_PATTERN = re.compile(r"10\.\d{4,9}/[\x21-\x7E]+")
+# Byte-level twin of ``DOI_PATTERN`` for scanning export files without decoding them.
+DOI_PATTERN_BYTES = re.compile(rb"10\.\d{4,9}/[\x21-\x7E]+")
+DOI_URL_PREFIX = re.compile(r"^https?://(?:dx\.)?doi\.org/", re.IGNORECASE)
 WILEY_PREFIXES = ("10.1002", "10.1111")
 ELSEVIER_PREFIXES = ("10.1016", "10.1011")  # 10.1011 is rare but reserved by Elsevier
 SPRINGER_PREFIXES = ("10.1007", "10.1038", "10.1186")
+_PUBLISHER_BY_PREFIX = {
+    **dict.fromkeys(WILEY_PREFIXES, "Wiley"),
+    **dict.fromkeys(ELSEVIER_PREFIXES, "Elsevier"),
+    **dict.fromkeys(SPRINGER_PREFIXES, "Springer"),
+}
+# Every publisher label ``classify_publisher`` can return.
+_ROUTED_PUBLISHERS = frozenset({*_PUBLISHER_BY_PREFIX.values(), "Crossref"})
 DEFAULT_DELAY_SECONDS = 1.5  # respect the 1 PDF/sec cap with a small safety margin
+# Absolute paths of dotenv files already applied; variables are never overridden, so
+# reading the same file again could not change ``os.environ``.
+_LOADED_ENV_FILES: set[str] = set()
+
 
+def load_env_file(path: Path | str = ".env", *, force: bool = False) -> bool:
+    """
+    Populate ``os.environ`` with key/value pairs from a dotenv-style file.
 
-def load_env_file(path: Path | str = ".env") -> bool:
-    """Populate ``os.environ`` with key/value pairs from a dotenv-style file."""
+    Each file is read once per process; later calls return ``True`` without touching the
+    filesystem. Pass ``force=True`` to pick up a file that has been edited since.
+    """
+    key_path = os.path.abspath(path)
+    if key_path in _LOADED_ENV_FILES and not force:
+        return True
     env_path = Path(path)
     if not env_path.exists():
         LOGGER.debug("No .env file found at %s", env_path)
@@ -51,7 +82,9 @@ def load_env_file(path: Path | str = ".env") -> bool:
             os.environ[key] = value
             loaded += 1
 
+    _LOADED_ENV_FILES.add(key_path)
     if loaded:
+        _env_setting.cache_clear()
         LOGGER.info("Loaded %d environment variables from %s", loaded, env_path)
     else:
         LOGGER.debug("No new environment variables loaded from %s", env_path)
@@ -67,6 +100,17 @@ def extract_dois(savedrecs_path: Path) -> list[str]:
     
     Also supports real Excel files (.xls/.xlsx) with a DOI column.
     """
+    return list(iter_savedrecs_dois(savedrecs_path))
+
+
+def iter_savedrecs_dois(savedrecs_path: Path) -> Iterator[str]:
+    """
+    Lazy form of :func:`extract_dois`: yields the same DOIs, in the same order.
+
+    Raw exports are scanned as they are consumed, so a caller that stops early (see
+    ``max_per_publisher`` in :func:`download_from_dois`) never reads the rest of the file.
+    """
+    excel_dois: Optional[list[str]] = None
     # Try to detect if it's a real Excel file by attempting to read with pandas
     try:
         import pandas as pd  # type: ignore
@@ -90,8 +134,7 @@ def extract_dois(savedrecs_path: Path) -> list[str]:
             for value in df[doi_column].dropna():
                 value_str = str(value).strip()
                 # Remove common prefixes like "https://doi.org/" or "http://dx.doi.org/"
-                if value_str.startswith(('https://doi.org/', 'http://doi.org/', 'https://dx.doi.org/', 'http://dx.doi.org/')):
-                    value_str = value_str.split('doi.org/')[-1]
+                value_str = normalize_doi(value_str)
                 # Validate it's a proper DOI format
                 if value_str and DOI_PATTERN.match(value_str):
                     dois_from_excel.append(value_str)
@@ -110,7 +153,7 @@ def extract_dois(savedrecs_path: Path) -> list[str]:
                         seen.add(doi)
                         deduplicated.append(doi)
                 LOGGER.info("Extracted %d DOIs from Excel file", len(deduplicated))
-                return deduplicated
+                excel_dois = deduplicated
         else:
             LOGGER.debug("No DOI column found in Excel file. Columns: %s", df.columns.tolist())
     except ImportError:
@@ -119,9 +162,80 @@ def extract_dois(savedrecs_path: Path) -> list[str]:
         # If pandas read fails, fall back to text parsing
         LOGGER.debug("Excel read failed, falling back to text parsing: %s", e)
     
-    # Fall back to original text-based parsing for Web of Science exports
-    text = savedrecs_path.read_text(encoding="latin-1", errors="ignore")
-    return extract_dois_from_text(text)
+    if excel_dois is not None:
+        yield from excel_dois
+        return
+    # Fall back to scanning the raw bytes of the Web of Science export
+    yield from iter_file_dois(savedrecs_path)
+
+
+def iter_file_dois(path: Path) -> Iterator[str]:
+    """
+    Yield the unique DOI literals in ``path`` as they are found, in file order.
+
+    The file is scanned through a read-only memory map with ``DOI_PATTERN_BYTES``; DOI
+    characters are plain ASCII, so this finds exactly what decoding the file as Latin-1 and
+    calling :func:`extract_dois_from_text` would, without materialising the decoded text.
+    The file stays memory-mapped until the generator is exhausted or closed, so a consumer
+    such as :func:`download_from_dois` can start routing DOIs before the scan finishes.
+    """
+    with path.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            seen: set[bytes] = set()
+            for match in DOI_PATTERN_BYTES.finditer(data):
+                candidate = match.group(0)
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                yield candidate.decode("ascii")
+
+
+def load_savedrecs_dois(savedrecs_path: Path, cache_dir: Optional[Path] = None) -> list[str]:
+    """
+    Return ``extract_dois(savedrecs_path)``, reusing a cached DOI list when the export is unchanged.
+
+    The cache is a small JSON file in ``cache_dir`` keyed by the export's modification time and
+    size; pass ``None`` to always parse the file.
+    """
+    if cache_dir is None:
+        return extract_dois(savedrecs_path)
+
+    stat = savedrecs_path.stat()
+    cache_path = cache_dir / f"{savedrecs_path.stem}.{stat.st_mtime_ns}-{stat.st_size}.dois.json"
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        cached = None
+    except (OSError, ValueError) as exc:
+        LOGGER.debug("Ignoring unreadable DOI cache %s: %s", cache_path, exc)
+        cached = None
+    if isinstance(cached, list):
+        LOGGER.info("Loaded %d cached DOIs for %s from %s", len(cached), savedrecs_path, cache_path)
+        return cached
+
+    dois = extract_dois(savedrecs_path)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for stale in cache_dir.glob(f"{savedrecs_path.stem}.*.dois.json"):
+            stale.unlink()
+        cache_path.write_text(json.dumps(dois), encoding="utf-8")
+    except OSError as exc:
+        LOGGER.debug("Failed to write DOI cache %s: %s", cache_path, exc)
+    return dois
+
+
+def normalize_doi(raw: str) -> str:
+    """
+    Strip whitespace and any ``http(s)://(dx.)doi.org/`` prefix from a user-supplied DOI.
+
+    Returns an empty string for blank input.
+    """
+    value = (raw or "").strip()
+    if not value:
+        return ""
+    return DOI_URL_PREFIX.sub("", value).strip()
 
 
 def extract_dois_from_text(text: str) -> list[str]:
@@ -142,46 +256,77 @@ def extract_dois_from_text(text: str) -> list[str]:
 
 
 def classify_publisher(doi: str) -> str | None:
-    lowered = doi.lower()
-    if any(lowered.startswith(prefix) for prefix in WILEY_PREFIXES):
-        return "Wiley"
-    if any(lowered.startswith(prefix) for prefix in ELSEVIER_PREFIXES):
-        return "Elsevier"
-    if any(lowered.startswith(prefix) for prefix in SPRINGER_PREFIXES):
-        return "Springer"
-    return "Crossref"
-
-
-def records_from_dois(dois: Iterable[str]) -> list[ArticleRecord]:
-    records: list[ArticleRecord] = []
+    # Routing only depends on the registrant prefix (``10.XXXX``, digits and dots, so no
+    # case folding is needed); anything not owned by a dedicated client goes to Crossref.
+    return _PUBLISHER_BY_PREFIX.get(doi.partition("/")[0], "Crossref")
+
+
+def records_from_dois(dois: Iterable[str]) -> Iterator[ArticleRecord]:
+    """Yield one :class:`ArticleRecord` per routable DOI, consuming ``dois`` lazily."""
     for doi in dois:
         publisher = classify_publisher(doi)
         if not publisher:
             LOGGER.debug("Skipping DOI %s (unsupported publisher)", doi)
             continue
-        records.append(
-            ArticleRecord(
-                title=f"DOI {doi}",
-                doi=doi,
-                publisher=publisher,
-            )
+        yield ArticleRecord(
+            title=f"DOI {doi}",
+            doi=doi,
+            publisher=publisher,
         )
-    return records
 
 
 def _limit_records_per_publisher(
-    records: list[ArticleRecord], max_per_publisher: int
-) -> list[ArticleRecord]:
-    limited: list[ArticleRecord] = []
+    records: Iterable[ArticleRecord], max_per_publisher: int
+) -> Iterator[ArticleRecord]:
+    # Stops reading ``records`` once every publisher ``classify_publisher`` can return is full.
     counts: dict[str, int] = {}
+    full = 0
     for record in records:
         publisher_key = (record.publisher or "").lower()
         counts.setdefault(publisher_key, 0)
         if counts[publisher_key] >= max_per_publisher:
             continue
-        limited.append(record)
         counts[publisher_key] += 1
-    return limited
+        yield record
+        if counts[publisher_key] == max_per_publisher:
+            full += 1
+            if full >= len(_ROUTED_PUBLISHERS):
+                return
+
+
+class DownloadStream(Iterator[Path]):
+    """
+    Iterator over downloaded paths that also exposes the batch's per-publisher ``metrics``.
+
+    ``iter()`` hands back the underlying generator itself, so ``for`` loops and ``list()``
+    resume it directly instead of going through :meth:`__next__` for every path.
+    Call :meth:`close` (or wrap the stream in :func:`contextlib.closing`) when it may not be
+    exhausted, so the batch stops and a metadata cache opened for it is released.
+    """
+
+    def __init__(
+        self,
+        iterator: Iterator[Path],
+        metrics: dict[str, dict[str, int]],
+        owned_cache: Optional[MetadataCache] = None,
+    ) -> None:
+        self._iterator = iterator
+        self.metrics = metrics
+        self._owned_cache = owned_cache
+
+    def __iter__(self) -> Iterator[Path]:
+        return self._iterator
+
+    def __next__(self) -> Path:
+        return next(self._iterator)
+
+    def close(self) -> None:
+        """Stop the batch and close the metadata cache opened for it, if any."""
+        close = getattr(self._iterator, "close", None)
+        if close is not None:
+            close()
+        if self._owned_cache is not None:
+            self._owned_cache.close()
 
 
 def download_from_savedrecs(
@@ -192,16 +337,31 @@ def download_from_savedrecs(
     max_per_publisher: int | None = None,
     overwrite: bool = False,
     dry_run: bool = False,
+    http_adapter: Optional[HTTPAdapter] = None,
+    cache_dir: Optional[Path] = None,
+    concurrency: int = 1,
+    metadata_cache: Optional[MetadataCache] = None,
   ) -> Iterator[Path]:
       """
       Download PDFs (and any discoverable SI files) referenced in ``savedrecs.xls`` while honoring publisher rate limits.
 
       When ``dry_run`` is ``True``, the function only reports on the detected DOIs and
       which publishers are configured, without attempting any downloads.
+      Pass ``http_adapter`` to share one connection pool across several calls, and
+      ``cache_dir`` to reuse the parsed DOI list while the export file is unchanged and to keep
+      a metadata cache there (see :func:`download_from_dois`). With ``max_per_publisher`` the
+      export is streamed instead, so the scan stops once every publisher has its quota.
+      ``concurrency`` and ``metadata_cache`` are forwarded to :func:`download_from_dois`.
       """
       load_env_file()
-      dois = extract_dois(savedrecs)
-      LOGGER.info("Extracted %d DOIs from %s", len(dois), savedrecs)
+      dois: Iterable[str]
+      if cache_dir is None or max_per_publisher is not None:
+          # Streamed, so ``max_per_publisher`` can end the scan once every publisher is full;
+          # that beats reading the whole cached DOI list for a capped run.
+          dois = iter_savedrecs_dois(savedrecs)
+      else:
+          dois = load_savedrecs_dois(savedrecs, cache_dir)
+          LOGGER.info("Extracted %d DOIs from %s", len(dois), savedrecs)
       return download_from_dois(
           dois=dois,
           output_dir=output_dir,
@@ -210,6 +370,10 @@ def download_from_savedrecs(
           overwrite=overwrite,
           dry_run=dry_run,
           load_env=False,
+          http_adapter=http_adapter,
+          cache_dir=cache_dir,
+          concurrency=concurrency,
+          metadata_cache=metadata_cache,
       )
 
 
@@ -222,24 +386,41 @@ def download_from_dois(
     overwrite: bool = False,
     dry_run: bool = False,
     load_env: bool = True,
+    http_adapter: Optional[HTTPAdapter] = None,
+    cache_dir: Optional[Path] = None,
+    concurrency: int = 1,
+    metadata_cache: Optional[MetadataCache] = None,
 ) -> Iterator[Path]:
     """
     Download PDFs for the provided DOI list using the configured publisher clients.
 
-    ``dois`` may be any iterable; it is consumed eagerly so the caller can supply generators.
+    ``dois`` may be any iterable, including a generator; it is consumed once, straight into
+    the record list, without keeping a separate copy of the DOIs.
     Set ``load_env`` to ``False`` when credentials are injected programmatically.
+    ``http_adapter`` (see :func:`auto_paper_download.sessions.build_http_adapter`) lets callers
+    that invoke this function repeatedly keep their keep-alive connections between calls.
+    With ``cache_dir`` set, Springer, Crossref and OpenAlex metadata lookups are stored in a
+    SQLite file there and reused by later runs until they expire; the file is closed once the
+    returned stream is exhausted or closed. Callers that invoke this function repeatedly can
+    instead open one :class:`~auto_paper_download.cache.MetadataCache` and pass it as
+    ``metadata_cache`` (it takes precedence over ``cache_dir`` and is left open).
+    With ``concurrency`` above 1, up to that many records download at once (each publisher
+    stays within its ``DEFAULT_PUBLISHER_CONCURRENCY`` cap) and paths arrive in completion order.
     """
     if load_env:
         load_env_file()
 
-    doi_list = list(dois)
-    if not doi_list:
+    supplied: Counter[str] = Counter()
+    records = _prepare_records(
+        _count_into(dois, supplied), max_per_publisher=max_per_publisher
+    )
+    if not supplied["dois"]:
         LOGGER.warning("No DOIs supplied for download.")
         return iter(())
 
-    LOGGER.info("Preparing downloads for %d DOI(s).", len(doi_list))
-    records = _prepare_records(doi_list, max_per_publisher=max_per_publisher)
-
+    LOGGER.info(
+        "Preparing downloads for %d record(s) from %d DOI(s).", len(records), supplied["dois"]
+    )
     if not records:
         LOGGER.warning("No Wiley, Elsevier, Springer, or Crossref-eligible DOIs detected.")
         return iter(())
@@ -250,16 +431,64 @@ def download_from_dois(
         delay_seconds=delay_seconds,
         overwrite=overwrite,
         dry_run=dry_run,
+        http_adapter=http_adapter,
+        cache_dir=cache_dir,
+        concurrency=concurrency,
+        metadata_cache=metadata_cache,
     )
 
 
+def _stream_downloads(
+    batch_download: Callable[..., Iterator[Path]],
+    *,
+    records: list[ArticleRecord],
+    output_root: Path,
+    overwrite: bool,
+    crossref_client: Optional[CrossrefClient],
+    openalex_client: Optional[OpenAlexClient],
+    owned_cache: Optional[MetadataCache] = None,
+    **download_kwargs: Any,
+) -> Iterator[Path]:
+    # Runs only once the stream is iterated, so building it sends no requests. The listing
+    # of existing article folders is shared by the bulk metadata lookup and the batch.
+    try:
+        existing_dirs = _batch_article_dirs(records, output_root, overwrite=overwrite)
+        if len(records) > 1:
+            _prefetch_batch_metadata(
+                records,
+                output_root=output_root,
+                crossref_client=crossref_client,
+                openalex_client=openalex_client,
+                overwrite=overwrite,
+                existing_dirs=existing_dirs,
+            )
+        yield from batch_download(
+            records=records,
+            output_root=output_root,
+            overwrite=overwrite,
+            crossref_client=crossref_client,
+            openalex_client=openalex_client,
+            existing_dirs=existing_dirs,
+            **download_kwargs,
+        )
+    finally:
+        if owned_cache is not None:
+            owned_cache.close()
+
+
+def _count_into(dois: Iterable[str], counter: Counter) -> Iterator[str]:
+    for doi in dois:
+        counter["dois"] += 1
+        yield doi
+
+
 def _prepare_records(
     dois: Iterable[str], *, max_per_publisher: int | None = None
 ) -> list[ArticleRecord]:
-    records = records_from_dois(dois)
+    records: Iterable[ArticleRecord] = records_from_dois(dois)
     if max_per_publisher is not None:
         records = _limit_records_per_publisher(records, max_per_publisher)
-    return records
+    return list(records)
 
 
 def _execute_download(
@@ -269,8 +498,25 @@ def _execute_download(
     delay_seconds: float,
     overwrite: bool,
     dry_run: bool,
+    http_adapter: Optional[HTTPAdapter] = None,
+    cache_dir: Optional[Path] = None,
+    concurrency: int = 1,
+    metadata_cache: Optional[MetadataCache] = None,
 ) -> Iterator[Path]:
     records = list(records)
+    # Every client gets its own session (credentials live in session headers) but all of
+    # them draw from the same pool, so repeated requests to a host reuse the TLS connection.
+    # The pool keeps at least one connection per worker for a host: urllib3 discards
+    # connections beyond ``pool_maxsize`` when they are returned, which would mean a fresh
+    # TLS handshake per request once every worker hits the same metadata API.
+    adapter = http_adapter or build_http_adapter(
+        pool_maxsize=max(DEFAULT_POOL_MAXSIZE, concurrency)
+    )
+    # A cache opened here belongs to this call. It is closed when the stream is exhausted or
+    # closed, or here if no stream is returned.
+    owned_cache: Optional[MetadataCache] = None
+    if metadata_cache is None and cache_dir is not None and not dry_run:
+        metadata_cache = owned_cache = MetadataCache(cache_dir / METADATA_CACHE_FILENAME)
     disabled_publishers: list[str] = []
 
     def has_records(publisher_name: str) -> bool:
@@ -285,21 +531,23 @@ def _execute_download(
     wiley_client: Optional[WileyClient] = None
     if has_records("Wiley"):
         try:
-            wiley_client = WileyClient()
+            wiley_client = WileyClient(session=build_session(adapter=adapter))
         except ValueError as exc:
             disable_publisher("Wiley", str(exc))
 
     elsevier_client: Optional[ElsevierClient] = None
     if has_records("Elsevier"):
         try:
-            elsevier_client = ElsevierClient()
+            elsevier_client = ElsevierClient(session=build_session(adapter=adapter))
         except ValueError as exc:
             disable_publisher("Elsevier", str(exc))
 
     springer_client: Optional[SpringerClient] = None
     if has_records("Springer"):
         try:
-            springer_client = SpringerClient()
+            springer_client = SpringerClient(
+                session=build_session(adapter=adapter), metadata_cache=metadata_cache
+            )
         except ValueError as exc:
             disable_publisher("Springer", str(exc))
 
@@ -309,12 +557,16 @@ def _execute_download(
         crossref_error: Optional[str] = None
         openalex_error: Optional[str] = None
         try:
-            crossref_client = CrossrefClient()
+            crossref_client = CrossrefClient(
+                session=build_session(adapter=adapter), metadata_cache=metadata_cache
+            )
         except ValueError as exc:
             crossref_error = str(exc)
             LOGGER.warning("Crossref downloads disabled: %s", exc)
         try:
-            openalex_client = OpenAlexClient()
+            openalex_client = OpenAlexClient(
+                session=build_session(adapter=adapter), metadata_cache=metadata_cache
+            )
         except ValueError as exc:
             openalex_error = str(exc)
             LOGGER.warning("OpenAlex downloads disabled: %s", exc)
@@ -325,7 +577,7 @@ def _execute_download(
 
     unpaywall_client: Optional[UnpaywallClient] = None
     try:
-        unpaywall_client = UnpaywallClient()
+        unpaywall_client = UnpaywallClient(session=build_session(adapter=adapter))
     except ValueError as exc:
         LOGGER.debug("Unpaywall fallback unavailable: %s", exc)
 
@@ -333,6 +585,8 @@ def _execute_download(
         LOGGER.warning(
             "No Wiley, Elsevier, Springer, or Crossref DOIs remain after applying configuration checks."
         )
+        if owned_cache is not None:
+            owned_cache.close()
         return iter(())
 
     counts = Counter(rec.publisher for rec in records if rec.publisher)
@@ -368,13 +622,21 @@ def _execute_download(
             enforced_delay,
         )
     metrics: dict[str, dict[str, int]] = {}
+    download_kwargs = {}
+    batch_download = batched_download
+    if concurrency > 1:
+        LOGGER.info("Downloading up to %d records concurrently.", concurrency)
+        batch_download = batched_download_threaded
+        download_kwargs["max_workers"] = concurrency
     try:
-        generator = batched_download(
+        generator = _stream_downloads(
+            batch_download,
             records=records,
             output_root=output_dir,
             elsevier_client=elsevier_client,
             crossref_client=crossref_client,
             openalex_client=openalex_client,
+            owned_cache=owned_cache,
             unpaywall_client=unpaywall_client,
             springer_client=springer_client,
             wiley_client=wiley_client,
@@ -382,20 +644,11 @@ def _execute_download(
             delay_seconds=enforced_delay,
             raise_on_error=False,
             metrics=metrics,
+            supplement_session=build_session(adapter=adapter),
+            **download_kwargs,
         )
     except DownloadError as exc:
         LOGGER.error("Publisher download failed: %s", exc)
         raise
 
-    class DownloadStream(Iterator[Path]):
-        def __init__(self, iterator: Iterator[Path], stats: dict[str, dict[str, int]]):
-            self._iterator = iterator
-            self.metrics = stats
-
-        def __iter__(self) -> "DownloadStream":
-            return self
-
-        def __next__(self) -> Path:
-            return next(self._iterator)
-
-    return DownloadStream(generator, metrics)
+    return DownloadStream(generator, metrics, owned_cache)
@@ -0,0 +1,118 @@
+"""
+Token buckets that pace requests per host (shared by every client) or per publisher.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Hashable, Mapping, Optional
+
+RATE_LIMIT_HEADER = "X-Rate-Limit-Limit"
+RATE_INTERVAL_HEADER = "X-Rate-Limit-Interval"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at ``rate`` tokens per second, holding at most ``burst``.
+
+    The bucket starts full, so the first ``burst`` requests go out immediately.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError("TokenBucket rate must be positive.")
+        self._rate = rate
+        self._capacity = max(burst, 1.0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                self._cond.wait((1.0 - self._tokens) / self._rate)
+
+    def retune(self, rate: float, burst: Optional[float] = None) -> None:
+        """Change the refill rate (and optionally the burst size), waking any waiting callers."""
+        if rate <= 0:
+            return
+        with self._cond:
+            self._refill()
+            self._rate = rate
+            if burst is not None:
+                self._capacity = max(burst, 1.0)
+                self._tokens = min(self._tokens, self._capacity)
+            self._cond.notify_all()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+
+_BUCKETS: dict[str, TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def host_bucket(host: str, *, rate: float, burst: float = 1.0) -> TokenBucket:
+    """
+    Return the bucket shared by all requests to ``host``, creating it with ``rate``/``burst``.
+
+    The first caller for a host decides its initial settings; later callers share that bucket.
+    """
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(host)
+        if bucket is None:
+            bucket = _BUCKETS[host] = TokenBucket(rate, burst)
+        return bucket
+
+
+def parse_rate_limit(headers: Mapping[str, str]) -> Optional[tuple[float, float]]:
+    """
+    Read ``X-Rate-Limit-Limit``/``X-Rate-Limit-Interval`` (e.g. ``50`` and ``1s``).
+
+    Returns ``(requests_per_second, burst)`` or ``None`` when the headers are absent or malformed.
+    """
+    limit = headers.get(RATE_LIMIT_HEADER)
+    interval = headers.get(RATE_INTERVAL_HEADER)
+    if not limit or not interval:
+        return None
+    try:
+        limit_value = float(limit)
+        interval_seconds = float(interval.strip().rstrip("s"))
+    except ValueError:
+        return None
+    if limit_value <= 0 or interval_seconds <= 0:
+        return None
+    return limit_value / interval_seconds, limit_value
+
+
+class KeyedBuckets:
+    """
+    Lazily created :class:`TokenBucket` per key, all sharing the same ``rate`` and ``burst``.
+
+    Used to pace each publisher on its own, so one publisher's delay never holds up another.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._buckets: dict[Hashable, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable) -> None:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self._rate, self._burst)
+        bucket.acquire()
@@ -0,0 +1,297 @@
+"""
+Helpers for building ``requests`` sessions that share one pooled set of keep-alive connections,
+and for streaming their response bodies to disk.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import os
+import queue
+import re
+import threading
+from pathlib import Path
+from typing import Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_CONNECTIONS = 16
+DEFAULT_POOL_MAXSIZE = 32
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+# Large reads keep the per-chunk Python overhead negligible for multi-megabyte PDFs.
+STREAM_CHUNK_SIZE = 1 << 20
+# Chunks that may wait for the writer thread (see ``_copy_body``) before reads pause.
+WRITE_QUEUE_DEPTH = 4
+# Set to 1 to keep freshly written PDFs out of the page cache during bulk harvests.
+DROP_PAGE_CACHE_ENV = "PDF_DROP_PAGE_CACHE"
+# Statuses a resumable download can answer with: full body, the requested tail, or
+# "range not satisfiable" when the partial file already holds the whole body.
+RESUMABLE_STATUS_CODES = frozenset({200, 206, 416})
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-")
+# urllib3 2.x can add random jitter to each backoff (so workers that hit the same 429 or
+# 503 retry at different moments) and cap the wait; 1.x has neither option.
+_RETRY_BACKOFF_OPTIONS = (
+    {"backoff_jitter": 0.5, "backoff_max": 30.0}
+    if "backoff_jitter" in inspect.signature(Retry).parameters
+    else {}
+)
+
+
+class ResponseTooLarge(requests.exceptions.RequestException):
+    """Raised by :func:`stream_to_file` when a body grows past its ``max_bytes`` limit."""
+
+
+def build_retry(*, total: int = 5, backoff_factor: float = 0.5) -> Retry:
+    """
+    Retry policy for idempotent requests: connection errors and transient HTTP statuses.
+
+    ``Retry-After`` is honoured on 429/503; other waits grow as ``backoff_factor * 2**n``
+    seconds, with jitter and a 30 second cap on urllib3 2.x. 401/403/404 are never retried.
+    Once the retries are used up the last response is returned rather than raised, so
+    callers keep reporting the publisher's status and body.
+    """
+    return Retry(
+        total=total,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+        **_RETRY_BACKOFF_OPTIONS,
+    )
+
+
+def build_http_adapter(
+    *,
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    max_retries: Optional[Retry] = None,
+) -> HTTPAdapter:
+    """
+    Create a transport adapter whose connection pool can be mounted on several sessions.
+
+    ``pool_connections`` is the number of hosts kept warm and ``pool_maxsize`` the number of
+    keep-alive connections retained per host. ``max_retries`` defaults to :func:`build_retry`.
+    """
+    return HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=max_retries if max_retries is not None else build_retry(),
+    )
+
+
+def build_session(*, adapter: Optional[HTTPAdapter] = None) -> requests.Session:
+    """
+    Return a ``requests.Session`` whose HTTP(S) traffic goes through ``adapter``.
+
+    Each session keeps its own headers, so publisher clients can carry their credentials
+    while reusing the TLS connections held by a shared adapter. A fresh adapter is created
+    when none is supplied.
+    """
+    session = requests.Session()
+    adapter = adapter or build_http_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def partial_path(destination: Path, url: str) -> Path:
+    """
+    Path of the partial file kept for ``url`` while it downloads to ``destination``.
+
+    The name includes a digest of ``url`` so fallbacks that write the same destination from a
+    different source never resume each other's bytes.
+    """
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+    return destination.with_name(f"{destination.name}.{digest}.part")
+
+
+def resume_headers(
+    destination: Path, url: str, headers: Optional[Mapping[str, str]] = None
+) -> dict[str, str]:
+    """
+    Return ``headers`` plus a ``Range`` request for the bytes missing from an earlier attempt.
+
+    Pass the result to the ``GET`` for ``url`` and the response to
+    ``stream_to_file(..., resume_url=url)``.
+    """
+    merged = dict(headers or {})
+    try:
+        offset = partial_path(destination, url).stat().st_size
+    except FileNotFoundError:
+        offset = 0
+    if offset:
+        merged["Range"] = f"bytes={offset}-"
+        # Ranges over a compressed representation would not line up with the bytes on disk.
+        merged["Accept-Encoding"] = "identity"
+    return merged
+
+
+def stream_to_file(
+    response: requests.Response,
+    destination: Path,
+    *,
+    resume_url: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+) -> tuple[int, bytes]:
+    """
+    Write the body of a ``stream=True`` response to ``destination``.
+
+    Returns the number of bytes written and the first eight bytes of the body, which callers
+    use to check the file signature. ``destination`` is removed if the transfer fails.
+    The body is read straight from ``response.raw`` while a helper thread writes it out;
+    read errors are raised as the same ``requests`` exceptions ``iter_content`` would raise.
+
+    With ``resume_url`` (the URL requested with :func:`resume_headers`), the body goes to
+    :func:`partial_path` instead: a ``206`` reply is appended to it, a ``200`` replaces it, and
+    a ``416`` means it is already complete. The partial file is kept if the transfer fails and
+    renamed to ``destination`` once it succeeds.
+
+    With ``max_bytes``, the transfer is aborted with :class:`ResponseTooLarge` as soon as
+    the decoded body read from ``response`` exceeds that many bytes.
+
+    The response is closed afterwards either way, returning its connection to the pool.
+    """
+    try:
+        return _write_response(response, destination, resume_url, max_bytes)
+    finally:
+        response.close()
+
+
+def _write_response(
+    response: requests.Response,
+    destination: Path,
+    resume_url: Optional[str],
+    max_bytes: Optional[int],
+) -> tuple[int, bytes]:
+    if resume_url is None:
+        try:
+            with _open_for_write(destination, "wb") as fout:
+                signature = _copy_body(response, fout, max_bytes)
+                total_bytes = fout.tell()
+                _maybe_drop_page_cache(fout)
+        except BaseException:
+            # A truncated file would otherwise be mistaken for a finished download on the next try.
+            destination.unlink(missing_ok=True)
+            raise
+        return total_bytes, signature
+
+    part = partial_path(destination, resume_url)
+    offset = part.stat().st_size if part.exists() else 0
+    if response.status_code == 416:
+        if not offset:
+            raise requests.exceptions.HTTPError(
+                f"416 Range Not Satisfiable without a partial file for {resume_url}",
+                response=response,
+            )
+        with part.open("rb") as fin:
+            signature = fin.read(8)
+        part.replace(destination)
+        return offset, signature
+
+    if response.status_code == 206:
+        match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+        if match is None or int(match.group(1)) != offset:
+            part.unlink(missing_ok=True)
+            raise requests.exceptions.ChunkedEncodingError(
+                f"Unexpected Content-Range for resumed download of {resume_url}"
+            )
+    else:
+        offset = 0
+
+    try:
+        with _open_for_write(part, "ab" if offset else "wb") as fout:
+            signature = _copy_body(response, fout, max_bytes)
+            total_bytes = fout.tell()
+            _maybe_drop_page_cache(fout)
+    except BaseException:
+        if not part.exists() or part.stat().st_size == 0:
+            part.unlink(missing_ok=True)
+        raise
+    if offset:
+        with part.open("rb") as fin:
+            signature = fin.read(8)
+    part.replace(destination)
+    return total_bytes, signature
+
+
+def _open_for_write(path: Path, mode: str):
+    """
+    Open ``path`` for writing, recreating its directory if it has disappeared.
+
+    Callers remember which article directories they already created (see
+    ``clients._ensure_dir``); this covers one removed behind their back since then.
+    """
+    try:
+        return path.open(mode)
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.open(mode)
+
+
+def _copy_body(response: requests.Response, fout, max_bytes: Optional[int] = None) -> bytes:
+    """
+    Copy the remaining body of ``response`` into ``fout`` and return its first eight bytes.
+
+    Chunks are handed to a writer thread through a short queue, so a slow disk write
+    overlaps with reading the next chunk from the socket instead of stalling it.
+    """
+    raw = response.raw
+    if raw is None:
+        raise ValueError("stream_to_file needs a response fetched with stream=True.")
+    raw.decode_content = True
+    pending: queue.Queue[Optional[bytes]] = queue.Queue(maxsize=WRITE_QUEUE_DEPTH)
+    write_errors: list[BaseException] = []
+
+    def _drain() -> None:
+        # Keep consuming after a failed write so the reader never blocks on a full queue.
+        while (chunk := pending.get()) is not None:
+            if not write_errors:
+                try:
+                    fout.write(chunk)
+                except BaseException as exc:  # noqa: BLE001 - re-raised on the reading thread
+                    write_errors.append(exc)
+
+    writer = threading.Thread(target=_drain, name="stream-writer", daemon=True)
+    writer.start()
+    try:
+        signature = raw.read(8)
+        pending.put(signature)
+        received = len(signature)
+        while not write_errors and (chunk := raw.read(STREAM_CHUNK_SIZE)):
+            received += len(chunk)
+            if max_bytes is not None and received > max_bytes:
+                raise ResponseTooLarge(
+                    f"Response body exceeds {max_bytes} bytes", response=response
+                )
+            pending.put(chunk)
+    except ProtocolError as exc:
+        raise requests.exceptions.ChunkedEncodingError(exc) from exc
+    except DecodeError as exc:
+        raise requests.exceptions.ContentDecodingError(exc) from exc
+    except ReadTimeoutError as exc:
+        raise requests.exceptions.ConnectionError(exc) from exc
+    finally:
+        pending.put(None)
+        writer.join()
+    if write_errors:
+        raise write_errors[0]
+    return signature
+
+
+def _maybe_drop_page_cache(fout) -> None:
+    if os.getenv(DROP_PAGE_CACHE_ENV) == "1" and hasattr(os, "posix_fadvise"):
+        _drop_page_cache(fout)
+
+
+def _drop_page_cache(fout) -> None:
+    """
+    Write ``fout`` through to disk, then tell the kernel its cached pages will not be reused.
+    """
+    fout.flush()
+    fd = fout.fileno()
+    os.fdatasync(fd)
+    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
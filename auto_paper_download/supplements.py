@@ -7,14 +7,26 @@ from __future__ import annotations
 import logging
 import mimetypes
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import Iterable, Optional
 from urllib.parse import urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from bs4.element import Tag
 
+from .cache import QueryCache
+from .sessions import ResponseTooLarge, build_session, stream_to_file
+
+try:
+    import lxml  # type: ignore  # noqa: F401
+
+    _HTML_PARSER = "lxml"
+except ImportError:  # optional speed-up; BeautifulSoup's pure-Python parser is used otherwise
+    _HTML_PARSER = "html.parser"
+
 LOGGER = logging.getLogger(__name__)
 
 SUPPLEMENT_USER_AGENT = (
@@ -33,7 +45,28 @@ SUPPORTING_KEYWORDS = (
     "extra file",
 )
 
+# One alternation instead of a substring test per keyword; matches exactly the same texts.
+_SUPPORTING_KEYWORDS_RE = re.compile("|".join(map(re.escape, SUPPORTING_KEYWORDS)))
+
 ALLOWED_EXTENSIONS = {".pdf"}
+# Only links are inspected, so scripts, styles and the rest of the page are never built.
+_ANCHOR_STRAINER = SoupStrainer("a", href=True)
+# Landing pages larger than this are cut off; supplement links sit well within it.
+LANDING_PAGE_MAX_BYTES = 8 << 20
+# Candidate assets of one article that are requested and written at the same time.
+SUPPLEMENT_CONCURRENCY = 4
+# Larger supplementary files (a mislabelled video or archive) are skipped or abandoned.
+MAX_SUPPLEMENT_BYTES = 100 << 20
+# Landing pages whose candidate links are remembered, and for how many seconds.
+LANDING_LINKS_CACHE_SIZE = 4096
+LANDING_LINKS_TTL = 3600.0
+
+_CD_FILENAME_STAR_RE = re.compile(r'filename\\*=UTF-8\'\'(?P<value>[^;]+)')
+_CD_FILENAME_RE = re.compile(r'filename="?(?P<value>[^";]+)"?')
+_UNSAFE_FILENAME_CHARS = re.compile(r"[\\\\/:*?\"<>|]")
+# Parsed landing pages by lowercase DOI: ``(base_url, candidate_links)``. Retries and
+# overwrite runs reuse them instead of fetching and parsing the page again.
+_LANDING_LINKS = QueryCache(default_ttl=LANDING_LINKS_TTL, max_size=LANDING_LINKS_CACHE_SIZE)
 
 
 def download_supplements_for_doi(
@@ -45,11 +78,16 @@ def download_supplements_for_doi(
     max_links: int = 10,
     user_agent: Optional[str] = None,
     publisher: Optional[str] = None,
+    max_bytes: Optional[int] = MAX_SUPPLEMENT_BYTES,
 ) -> list[Path]:
     """
     Attempt to discover and download supplementary assets linked from a DOI landing page.
 
-    Returns the list of downloaded file paths (empty if nothing was found).
+    Returns the list of downloaded file paths (empty if nothing was found). Up to
+    ``SUPPLEMENT_CONCURRENCY`` candidate assets are fetched at once over ``session``.
+    The candidate links of a landing page are cached for ``LANDING_LINKS_TTL`` seconds, so
+    asking again for the same DOI only requests the assets. Assets larger than ``max_bytes``
+    (by ``Content-Length`` or while streaming) are skipped; pass ``None`` to lift the limit.
 
     When ``publisher`` is provided, the function can apply publisher-specific handling—for
     example, Wiley landing pages that require authentication report a friendly message and
@@ -58,10 +96,84 @@ def download_supplements_for_doi(
     if not doi:
         return []
 
-    session = session or requests.Session()
+    session = session or _default_session()
     agent = user_agent or SUPPLEMENT_USER_AGENT
     session.headers.setdefault("User-Agent", agent)
 
+    cache_key = doi.lower()
+    landing = _LANDING_LINKS.get(cache_key)
+    if landing is None:
+        landing = _fetch_landing_links(doi, session=session, publisher=publisher)
+        if landing is None:
+            return []
+        _LANDING_LINKS.set(cache_key, landing)
+    base_url, raw_links = landing
+    if not raw_links:
+        LOGGER.info("No supplementary candidates detected for DOI %s", doi)
+        return []
+
+    candidates = raw_links[:max_links]
+    destination_dir.mkdir(parents=True, exist_ok=True)
+    request = partial(_request_asset, referer=base_url, session=session, max_bytes=max_bytes)
+    save = partial(_save_asset, max_bytes=max_bytes)
+    saved_paths: list[Path] = []
+    used_names: set[str] = set()
+    with ThreadPoolExecutor(
+        max_workers=min(SUPPLEMENT_CONCURRENCY, len(candidates)),
+        thread_name_prefix="supplements",
+    ) as executor:
+        # Links are handled in groups of ``SUPPLEMENT_CONCURRENCY``, so at most that many
+        # streamed responses are open at once. Within a group the requests overlap, then
+        # filenames are picked in link order, so a name collision always resolves the same
+        # way (and reruns find the same files).
+        for start in range(0, len(candidates), SUPPLEMENT_CONCURRENCY):
+            group = candidates[start : start + SUPPLEMENT_CONCURRENCY]
+            requested = list(executor.map(request, group))
+            try:
+                pending: list[tuple[Path, Optional[requests.Response]]] = []
+                for index, (candidate_url, (response, error)) in enumerate(
+                    zip(group, requested), start=start + 1
+                ):
+                    if error is not None:
+                        LOGGER.warning(
+                            "Failed to download supplementary asset for %s: %s", doi, error
+                        )
+                        continue
+                    if response is None:
+                        continue
+                    filename = _select_filename(
+                        url=candidate_url,
+                        response=response,
+                        fallback_basename=f"supplementary_{index}",
+                        used_names=used_names,
+                        force_suffix=".pdf",
+                    )
+                    destination = destination_dir / filename
+                    if destination.exists() and not overwrite:
+                        LOGGER.info("Skipping existing supplementary file: %s", destination)
+                        response.close()
+                        pending.append((destination, None))
+                        continue
+                    pending.append((destination, response))
+
+                saved_paths.extend(path for path in executor.map(save, pending) if path)
+            finally:
+                # Saved responses are already closed; this releases any left behind by an
+                # error, returning their connections to the pool.
+                for response, _ in requested:
+                    if response is not None:
+                        response.close()
+    return saved_paths
+
+
+def _fetch_landing_links(
+    doi: str, *, session: requests.Session, publisher: Optional[str]
+) -> Optional[tuple[str, tuple[str, ...]]]:
+    """
+    Fetch the DOI landing page and return its final URL with the candidate supplement links.
+
+    Returns ``None`` (after logging why) when the page could not be loaded.
+    """
     doi_url = f"https://doi.org/{doi}"
     try:
         response = session.get(
@@ -71,50 +183,70 @@ def download_supplements_for_doi(
             },
             timeout=60,
             allow_redirects=True,
+            stream=True,
         )
     except requests.RequestException as exc:  # noqa: BLE001
         LOGGER.warning("Failed to load DOI landing page for %s: %s", doi, exc)
-        return []
+        return None
 
-    if response.status_code >= 400:
-        if response.status_code == 403 and publisher and publisher.lower() == "wiley":
-            LOGGER.info("Wiley supplementary download skipped for %s: 受限，需要手动登录", doi)
-            return []
-        LOGGER.warning(
-            "DOI landing page lookup failed for %s (%s)", doi, response.status_code
-        )
-        return []
+    with response:
+        if response.status_code >= 400:
+            if response.status_code == 403 and publisher and publisher.lower() == "wiley":
+                LOGGER.info("Wiley supplementary download skipped for %s: 受限，需要手动登录", doi)
+                return None
+            LOGGER.warning(
+                "DOI landing page lookup failed for %s (%s)", doi, response.status_code
+            )
+            return None
+        try:
+            page = _read_landing_page(response)
+        except requests.RequestException as exc:  # noqa: BLE001
+            LOGGER.warning("Failed to load DOI landing page for %s: %s", doi, exc)
+            return None
 
     base_url = response.url or doi_url
-    soup = BeautifulSoup(response.text, "html.parser")
-    raw_links = list(_extract_candidate_links(soup, base_url))
-    if not raw_links:
-        LOGGER.info("No supplementary candidates detected for DOI %s", doi)
-        return []
+    # The parser gets bytes and works out the encoding itself (from the <meta> tag when the
+    # server names no charset), instead of requests decoding the whole page to a str first.
+    declared = "charset" in response.headers.get("Content-Type", "").lower()
+    charset = response.encoding if declared else None
+    soup = BeautifulSoup(
+        page, _HTML_PARSER, parse_only=_ANCHOR_STRAINER, from_encoding=charset
+    )
+    return base_url, tuple(_extract_candidate_links(soup, base_url))
 
-    saved_paths: list[Path] = []
-    used_names: set[str] = set()
-    destination_dir.mkdir(parents=True, exist_ok=True)
 
-    for index, candidate_url in enumerate(raw_links[:max_links], start=1):
-        try:
-            path = _download_single_asset(
-                url=candidate_url,
-                referer=base_url,
-                destination_dir=destination_dir,
-                session=session,
-                overwrite=overwrite,
-                used_names=used_names,
-                fallback_basename=f"supplementary_{index}",
-            )
-        except requests.RequestException as exc:  # noqa: BLE001
-            LOGGER.warning(
-                "Failed to download supplementary asset for %s: %s", doi, exc
+@lru_cache(maxsize=1)
+def _default_session() -> requests.Session:
+    """
+    Pooled session shared by calls that pass no ``session``, so landing pages and assets of
+    successive DOIs reuse keep-alive connections (and the adapter's retry policy).
+    """
+    session = build_session()
+    session.headers["User-Agent"] = SUPPLEMENT_USER_AGENT
+    return session
+
+
+def close_default_session() -> None:
+    """Close the shared default session and its pooled connections; the next call builds a new one."""
+    if _default_session.cache_info().currsize:
+        _default_session().close()
+    _default_session.cache_clear()
+
+
+def _read_landing_page(response: requests.Response) -> bytes:
+    """Read a streamed landing page, keeping at most ``LANDING_PAGE_MAX_BYTES``."""
+    page = bytearray()
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        page += chunk
+        if len(page) >= LANDING_PAGE_MAX_BYTES:
+            LOGGER.debug(
+                "Landing page %s exceeds %d bytes; parsing the first part only",
+                response.url,
+                LANDING_PAGE_MAX_BYTES,
             )
-            continue
-        if path:
-            saved_paths.append(path)
-    return saved_paths
+            del page[LANDING_PAGE_MAX_BYTES:]
+            break
+    return bytes(page)
 
 
 def _extract_candidate_links(soup: BeautifulSoup, base_url: str) -> Iterable[str]:
@@ -132,6 +264,15 @@ def _extract_candidate_links(soup: BeautifulSoup, base_url: str) -> Iterable[str
 
 
 def _looks_like_supplement(anchor: Tag, href: str) -> bool:
+    ext = Path(urlparse(href).path).suffix.lower()
+    href_lower = href.lower()
+    # A URL naming "supp" can never trip the main-article exclusion below, so when the URL
+    # alone qualifies, the anchor's text (a walk over its whole subtree) is not needed.
+    if "supp" in href_lower and (
+        ext in ALLOWED_EXTENSIONS or _SUPPORTING_KEYWORDS_RE.search(href_lower)
+    ):
+        return True
+
     text_parts = [anchor.get_text(separator=" ", strip=True)]
     for attr in ("title", "aria-label", "data-title", "data-label", "data-track-label"):
         value = anchor.attrs.get(attr)
@@ -143,57 +284,72 @@ def _looks_like_supplement(anchor: Tag, href: str) -> bool:
     if "article" in haystack and "pdf" in haystack and "supp" not in haystack:
         return False
 
-    if any(keyword in haystack for keyword in SUPPORTING_KEYWORDS):
+    if _SUPPORTING_KEYWORDS_RE.search(haystack):
         return True
 
-    parsed = urlparse(href)
-    ext = Path(parsed.path).suffix.lower()
     if ext and ext in ALLOWED_EXTENSIONS:
         return True
 
     return False
 
 
-def _download_single_asset(
-    *,
-    url: str,
-    referer: str,
-    destination_dir: Path,
-    session: requests.Session,
-    overwrite: bool,
-    used_names: set[str],
-    fallback_basename: str,
-) -> Optional[Path]:
+def _request_asset(
+    url: str, *, referer: str, session: requests.Session, max_bytes: Optional[int] = None
+) -> tuple[Optional[requests.Response], Optional[requests.RequestException]]:
+    """
+    Open a streamed request for a candidate asset; the response is kept only for PDFs
+    whose declared ``Content-Length`` fits within ``max_bytes``.
+
+    Request errors are returned rather than raised so one failing link does not cancel
+    its siblings in the worker pool.
+    """
     headers = {"Referer": referer, "Accept": "application/pdf"}
-    response = session.get(url, timeout=120, stream=True, headers=headers)
+    try:
+        response = session.get(url, timeout=120, stream=True, headers=headers)
+    except requests.RequestException as exc:  # noqa: BLE001
+        return None, exc
     if response.status_code >= 400:
         LOGGER.warning(
             "Supplementary asset request failed %s (%s)", url, response.status_code
         )
-        return None
+        response.close()
+        return None, None
 
     content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
     url_ext = Path(urlparse(url).path).suffix.lower()
     if url_ext != ".pdf" and "pdf" not in content_type:
         LOGGER.debug("Ignoring non-PDF supplementary asset %s (content-type=%s)", url, content_type or "unknown")
-        return None
+        response.close()
+        return None, None
+    declared = response.headers.get("Content-Length", "")
+    if max_bytes is not None and declared.isdigit() and int(declared) > max_bytes:
+        LOGGER.warning(
+            "Skipping supplementary asset %s: %s bytes exceeds the %d byte limit",
+            url,
+            declared,
+            max_bytes,
+        )
+        response.close()
+        return None, None
+    return response, None
 
-    filename = _select_filename(
-        url=url,
-        response=response,
-        fallback_basename=fallback_basename,
-        used_names=used_names,
-        force_suffix=".pdf",
-    )
-    destination = destination_dir / filename
-    if destination.exists() and not overwrite:
-        LOGGER.info("Skipping existing supplementary file: %s", destination)
-        return destination
 
-    with destination.open("wb") as handle:
-        for chunk in response.iter_content(chunk_size=65536):
-            if chunk:
-                handle.write(chunk)
+def _save_asset(
+    job: tuple[Path, Optional[requests.Response]], *, max_bytes: Optional[int] = None
+) -> Optional[Path]:
+    destination, response = job
+    if response is None:
+        return destination
+    try:
+        stream_to_file(response, destination, max_bytes=max_bytes)
+    except ResponseTooLarge:
+        LOGGER.warning(
+            "Abandoned supplementary asset %s: larger than %d bytes", response.url, max_bytes
+        )
+        return None
+    except requests.RequestException as exc:  # noqa: BLE001
+        LOGGER.warning("Failed to download supplementary asset %s: %s", response.url, exc)
+        return None
     return destination
 
 
@@ -241,16 +397,16 @@ def _select_filename(
 def _filename_from_content_disposition(header_value: str) -> str:
     if not header_value:
         return ""
-    match = re.search(r'filename\\*=UTF-8\'\'(?P<value>[^;]+)', header_value)
+    match = _CD_FILENAME_STAR_RE.search(header_value)
     if match:
         return match.group("value")
-    match = re.search(r'filename="?(?P<value>[^";]+)"?', header_value)
+    match = _CD_FILENAME_RE.search(header_value)
     if match:
         return match.group("value")
     return ""
 
 
 def _sanitize_filename(candidate: str) -> str:
-    cleaned = re.sub(r"[\\\\/:*?\"<>|]", "_", candidate)
+    cleaned = _UNSAFE_FILENAME_CHARS.sub("_", candidate)
     cleaned = cleaned.strip().strip(".")
     return cleaned or "supplementary"